@@ -0,0 +1,172 @@
+"""Benchmarks for TaxEase Analyzer's processing paths.
+
+Usage:
+    python benchmark.py csv --rows 20000000          # synthetic export (~1.5GB)
+    python benchmark.py csv --file exports/2025-06.csv
+    python benchmark.py quote --requests 100000       # single-order quote latency
+    python benchmark.py groupby --rows 10000000       # bincount aggregation kernel vs df.groupby
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import main
+
+STATES = ['CA', 'NY', 'TX', 'FL', 'IL', 'WA', 'GA', 'NC', 'PA', 'OH']
+CITIES = ['Los Angeles', 'San Francisco', 'New York', 'Buffalo', 'Houston', 'Austin', 'Miami', 'Chicago', 'Seattle', 'Atlanta']
+PRODUCTS = ['Software License', 'SaaS Subscription', 'Consulting Hours', 'Office Chair', 'Custom Development', 'Mobile App']
+
+def write_sales_csv(path, rows, extra_columns=20, block_rows=1_000_000, seed=0):
+    """Write a synthetic sales export shaped like our monthly files"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, block_rows):
+        n = min(block_rows, rows - start)
+        df = pd.DataFrame({
+            'order_id': np.arange(start, start + n),
+            'order_date': '2025-06-01',
+            'customer_state': rng.choice(STATES, n),
+            'ship_city': rng.choice(CITIES, n),
+            'product_description': rng.choice(PRODUCTS, n),
+            'sale_amount': rng.uniform(1, 5000, n).round(2)
+        })
+        for i in range(extra_columns):
+            df[f'attribute_{i}'] = rng.integers(0, 1000, n)
+        df.to_csv(path, mode='a' if start else 'w', header=not start, index=False)
+
+def best_time(fn, repeat):
+    """Return the fastest of several runs in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def bench_csv(args):
+    """Compare CSV engines and the chunked path on one file"""
+    path = args.file
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'sales.csv')
+        write_sales_csv(path, args.rows, args.extra_columns)
+    
+    try:
+        run_csv_engines(path, args)
+    finally:
+        if args.file is None:
+            os.remove(path)
+
+def run_csv_engines(path, args):
+    """Time each CSV engine, whole-file and chunked, against the same file"""
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    
+    engines = ['c'] + (['pyarrow'] if main.pa is not None else [])
+    print(f"{path}: {size_mb:,.1f} MB, {os.cpu_count()} CPUs")
+    print(f"{'engine':<10}{'chunk_size':>12}{'seconds':>10}{'MB/s':>10}{'speedup':>10}")
+    
+    baseline = None
+    for chunksize in [0, args.chunk_size]:
+        for engine in engines:
+            def run():
+                with open(path, 'rb') as file_stream:
+                    results = main.analyze_sales_data_csv(file_stream, chunksize=chunksize, engine=engine, backend='pandas')
+                assert results['success'], results.get('error')
+            
+            seconds = best_time(run, args.repeat)
+            baseline = baseline or seconds
+            print(f"{engine:<10}{chunksize:>12}{seconds:>10.2f}{size_mb / seconds:>10.1f}{baseline / seconds:>9.1f}x")
+
+def bench_groupby(args):
+    """Compare the factorized bincount kernel with df.groupby on string state/city/product keys"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'state': pd.Series(rng.choice(STATES, args.rows), dtype=object),
+        'city': pd.Series(rng.choice(CITIES, args.rows), dtype=object),
+        'product_type': pd.Series(rng.choice(main.PRODUCT_TYPES, args.rows), dtype=object),
+        'amount': rng.uniform(1, 5000, args.rows).round(2)
+    })
+    keys = [df['state'], df['city'], df['product_type']]
+    
+    def run_groupby():
+        return df['amount'].groupby(keys, observed=True, dropna=False).sum()
+    def run_group_sum():
+        return main.group_sum(keys, df['amount'].to_numpy())
+    
+    expected, actual = run_groupby(), run_group_sum()
+    assert expected.index.equals(actual.index) and np.allclose(expected.to_numpy(), actual.to_numpy())
+    
+    print(f"{args.rows:,} rows, {len(actual)} groups")
+    print(f"{'kernel':<16}{'seconds':>10}{'Mrows/s':>10}{'speedup':>10}")
+    baseline = None
+    for name, run in [('df.groupby', run_groupby), ('group_sum', run_group_sum)]:
+        seconds = best_time(run, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<16}{seconds:>10.3f}{args.rows / seconds / 1e6:>10.1f}{baseline / seconds:>9.1f}x")
+
+def latency_percentiles(timings):
+    """Return p50, p99 and max of per-call timings in microseconds"""
+    timings = np.asarray(timings) * 1e6
+    return np.percentile(timings, 50), np.percentile(timings, 99), timings.max()
+
+def bench_quote(args):
+    """Measure per-order quote latency, in-process and through the /api/quote endpoint"""
+    rng = np.random.default_rng(0)
+    orders = list(zip(
+        rng.choice(STATES, args.requests),
+        rng.choice(CITIES + [''], args.requests),
+        rng.choice(PRODUCTS, args.requests),
+        rng.uniform(1, 5000, args.requests).round(2).tolist()
+    ))
+    
+    client = main.app.test_client()
+    def call_quote(order):
+        main.quote_transaction(*order)
+    def call_endpoint(order):
+        state_code, city_name, product, amount = order
+        response = client.get('/api/quote', query_string={'state': state_code, 'city': city_name, 'product': product, 'amount': amount})
+        assert response.status_code == 200, response.get_json()
+    
+    print(f"{args.requests:,} orders, {len(PRODUCTS)} distinct products")
+    print(f"{'path':<16}{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'orders/s':>12}")
+    for name, call, count in [('quote_function', call_quote, args.requests), ('/api/quote', call_endpoint, min(args.requests, args.endpoint_requests))]:
+        timings = []
+        for order in orders[:count]:
+            started = time.perf_counter()
+            call(order)
+            timings.append(time.perf_counter() - started)
+        p50, p99, worst = latency_percentiles(timings)
+        print(f"{name:<16}{p50:>10.1f}{p99:>10.1f}{worst:>10.1f}{count / sum(timings):>12,.0f}")
+
+def main_cli():
+    """Parse arguments and run the selected benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    csv_parser = subparsers.add_parser('csv', help='CSV parsing engines for analyze_sales_data_csv')
+    csv_parser.add_argument('--file', help='Benchmark an existing export instead of a synthetic one')
+    csv_parser.add_argument('--rows', type=int, default=2_000_000)
+    csv_parser.add_argument('--extra-columns', type=int, default=20)
+    csv_parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    csv_parser.add_argument('--repeat', type=int, default=3)
+    csv_parser.set_defaults(run=bench_csv)
+    
+    quote_parser = subparsers.add_parser('quote', help='Single-order quote latency for quote_transaction and /api/quote')
+    quote_parser.add_argument('--requests', type=int, default=100000)
+    quote_parser.add_argument('--endpoint-requests', type=int, default=10000)
+    quote_parser.set_defaults(run=bench_quote)
+    
+    groupby_parser = subparsers.add_parser('groupby', help='group_sum aggregation kernel against df.groupby')
+    groupby_parser.add_argument('--rows', type=int, default=10_000_000)
+    groupby_parser.add_argument('--repeat', type=int, default=3)
+    groupby_parser.set_defaults(run=bench_groupby)
+    
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    args.run(args)
+
+if __name__ == '__main__':
+    main_cli()
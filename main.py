@@ -1,29 +1,156 @@
 import os
+import math
 import io
+import gzip
+import json
+import time
+import uuid
+import bisect
+import hashlib
+import shutil
 import logging
+import tempfile
+import zipfile
+import queue
+import threading
+import multiprocessing
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, flash, redirect, url_for, jsonify
+from flask import Flask, Request, render_template, request, flash, redirect, url_for, jsonify
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
+import click
+import numpy as np
 import pandas as pd
 import fitz  # PyMuPDF
 from PIL import Image
 import pytesseract
 import re
 
+try:
+    import pyarrow as pa  # Optional: multithreaded CSV parsing
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+try:
+    import zstandard  # Optional: .csv.zst uploads
+except ImportError:
+    zstandard = None
+
+try:
+    import duckdb  # Optional: out-of-core SQL aggregation for files larger than RAM
+except ImportError:
+    duckdb = None
+
+try:
+    import orjson  # Optional: faster JSON serialization of analysis results
+except ImportError:
+    orjson = None
+
+try:
+    import tesserocr  # Optional: keeps tesseract engines loaded between images
+except ImportError:
+    tesserocr = None
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
+class AnalysisJSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes NumPy and pandas scalars found in analysis results"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, LocalTaxRate):
+            return dict(o)
+        if isinstance(o, pd.Timestamp):
+            return o.isoformat()
+        if o is pd.NaT:
+            return None
+        return DefaultJSONProvider.default(o)
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize with orjson when installed, which handles NumPy scalars without the default hook"""
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
 app = Flask(__name__)
+app.json = AnalysisJSONProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "numeral-sales-tax-2025")
 
 # Configuration
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
-app.config['UPLOAD_EXTENSIONS'] = ['.csv', '.xlsx', '.xls', '.pdf', '.png', '.jpg', '.jpeg']
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_BYTES', 2 * 1024 ** 3))  # 2GB max file size by default
+app.config['UPLOAD_EXTENSIONS'] = ['.csv', '.xlsx', '.xls', '.pdf', '.png', '.jpg', '.jpeg', '.csv.gz', '.csv.zst', '.zip']
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['EXCEL_PARSE_WORKERS'] = int(os.environ.get('EXCEL_PARSE_WORKERS', os.cpu_count() or 1))  # Processes used to parse workbook sheets
+app.config['EXCEL_PARALLEL_MIN_BYTES'] = int(os.environ.get('EXCEL_PARALLEL_MIN_BYTES', 4 * 1024 * 1024))  # Smaller workbooks are parsed in-process
+app.config['PDF_PARSE_WORKERS'] = int(os.environ.get('PDF_PARSE_WORKERS', os.cpu_count() or 1))  # Processes used to extract PDF pages
+app.config['PDF_PARALLEL_MIN_PAGES'] = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 50))  # Smaller PDFs are extracted in-process
+app.config['DOLLAR_FLAG_THRESHOLD'] = float(os.environ.get('DOLLAR_FLAG_THRESHOLD', 10000))  # Document amounts above this are flagged
+app.config['CSV_CHUNK_SIZE'] = int(os.environ.get('CSV_CHUNK_SIZE', 0))  # Rows per chunk when streaming CSVs (0 = load whole file)
+app.config['CSV_ENGINE'] = os.environ.get('CSV_ENGINE', 'c')  # 'c' (pandas) or 'pyarrow' (multithreaded Arrow reader)
+app.config['SALES_BACKEND'] = os.environ.get('SALES_BACKEND', 'auto')  # 'auto' (pick by file size), 'pandas' or 'duckdb' (out-of-core SQL)
+app.config['ENGINE_SMALL_FILE_BYTES'] = int(os.environ.get('ENGINE_SMALL_FILE_BYTES', 64 * 1024 * 1024))  # Plain pandas at or below this size
+app.config['ENGINE_MEMORY_FRACTION'] = float(os.environ.get('ENGINE_MEMORY_FRACTION', 0.5))  # Share of available memory an in-memory load may use
+app.config['ENGINE_SAMPLE_BYTES'] = int(os.environ.get('ENGINE_SAMPLE_BYTES', 1024 * 1024))  # Bytes sampled to estimate row width
+app.config['DUCKDB_MEMORY_LIMIT'] = os.environ.get('DUCKDB_MEMORY_LIMIT', '2GB')  # DuckDB spills to UPLOAD_FOLDER beyond this
+app.config['CSV_ARROW_BLOCK_SIZE'] = int(os.environ.get('CSV_ARROW_BLOCK_SIZE', 64 * 1024 * 1024))  # Bytes per Arrow batch when streaming
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 32))  # Cached analysis results (0 = disabled)
+app.config['RESULT_CACHE_TTL'] = int(os.environ.get('RESULT_CACHE_TTL', 3600))  # Seconds before a cached result expires
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))  # Background workers processing queued uploads
+app.config['OCR_BACKEND'] = os.environ.get('OCR_BACKEND', 'auto')  # 'auto' (tesserocr when installed), 'tesserocr' or 'pytesseract'
+app.config['OCR_ENGINES'] = int(os.environ.get('OCR_ENGINES', os.cpu_count() or 1))  # Warm tesseract engines kept in the pool
+app.config['OCR_LANGUAGE'] = os.environ.get('OCR_LANGUAGE', 'eng')
+app.config['JOB_QUEUE_LIMIT'] = int(os.environ.get('JOB_QUEUE_LIMIT', 100))  # Max queued or running jobs before submissions are refused
+app.config['CHUNKED_UPLOAD_MAX_CHUNKS'] = int(os.environ.get('CHUNKED_UPLOAD_MAX_CHUNKS', 10000))  # Max chunks in one chunked upload
+app.config['CHUNKED_UPLOAD_TTL'] = int(os.environ.get('CHUNKED_UPLOAD_TTL', 24 * 3600))  # Seconds an unfinished chunked upload is kept
+app.config['JOB_RETENTION'] = int(os.environ.get('JOB_RETENTION', 3600))  # Seconds finished jobs stay available for polling
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 1))  # Files of a batch processed concurrently
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', 100))  # Max files accepted in one batch request
+app.config['JURISDICTION_RATES_PATH'] = os.environ.get('JURISDICTION_RATES_PATH')  # Compiled .npy (or .csv) of local jurisdiction rates; defaults to LOCAL_TAX_RATES
+app.config['ZIP_RANGES_PATH'] = os.environ.get('ZIP_RANGES_PATH')  # Compiled .npy (or .csv) of ZIP/ZIP+4 ranges per jurisdiction; unset disables ZIP resolution
+app.config['PRODUCT_CLASSIFY_CACHE_SIZE'] = int(os.environ.get('PRODUCT_CLASSIFY_CACHE_SIZE', 65536))  # Memoized product descriptions for quotes
+app.config['API_GZIP_MIN_BYTES'] = int(os.environ.get('API_GZIP_MIN_BYTES', 1024))  # API responses smaller than this are sent uncompressed
+app.config['API_GZIP_LEVEL'] = int(os.environ.get('API_GZIP_LEVEL', 5))
+app.config['BATCH_CSV_CHUNK_SIZE'] = int(os.environ.get('BATCH_CSV_CHUNK_SIZE', 1000000))  # Rows per chunk when batch CSVs are streamed
 
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+class SpooledUploadRequest(Request):
+    """Request that spools uploaded files to disk in UPLOAD_FOLDER instead of memory"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spooled = tempfile.NamedTemporaryFile('wb+', dir=app.config['UPLOAD_FOLDER'], prefix='upload-', delete=False)
+        self.spooled_files = getattr(self, 'spooled_files', []) + [spooled]
+        return spooled
+
+app.request_class = SpooledUploadRequest
+
+@app.teardown_request
+def remove_spooled_uploads(exc=None):
+    """Delete spooled upload files that were not claimed by a job"""
+    for spooled in getattr(request, 'spooled_files', []):
+        spooled.close()
+        if os.path.exists(spooled.name):
+            os.remove(spooled.name)
+
 # Product tax rules by state (simplified)
 PRODUCT_TAX_RULES = {
     'software': {
@@ -107,6 +234,31 @@ LOCAL_TAX_RATES = {
     }
 }
 
+# Product classification keywords, checked in order (first match wins)
+PRODUCT_TYPE_KEYWORDS = [
+    ('software', ['software', 'license', 'app']),
+    ('saas', ['saas', 'subscription', 'service', 'platform']),
+    ('consulting', ['consulting', 'development', 'custom', 'professional'])
+]
+PRODUCT_TYPE_PATTERNS = [
+    (product_type, re.compile('|'.join(re.escape(keyword) for keyword in keywords)))
+    for product_type, keywords in PRODUCT_TYPE_KEYWORDS
+]
+PRODUCT_TYPES = sorted([product_type for product_type, _ in PRODUCT_TYPE_KEYWORDS] + ['physical_goods'])
+
+# Uploads whose rows are aggregated into sales totals
+SALES_EXTENSIONS = ['.csv', '.csv.gz', '.csv.zst', '.zip', '.xlsx', '.xls']
+
+# Compressed CSV uploads and the decompression pandas and DuckDB apply while streaming them
+COMPRESSED_CSV_EXTENSIONS = {'.csv.gz': 'gzip', '.csv.zst': 'zstd'}
+
+# Pandas parsing peaks at roughly this multiple of the loaded frame's size
+PARSE_MEMORY_OVERHEAD = 3
+
+# Dollar amounts such as $12,500.00 in extracted document text
+DOLLAR_AMOUNT_PATTERN = re.compile(r'\$[\d,]+\.?\d*')
+NEWLINE_PATTERN = re.compile(r'\n')
+
 # US States with sales tax requirements
 US_STATES = {
     'AL': {'name': 'Alabama', 'rate': 0.04, 'nexus_threshold': 250000},
@@ -161,17 +313,26 @@ US_STATES = {
     'WY': {'name': 'Wyoming', 'rate': 0.04, 'nexus_threshold': 100000}
 }
 
+def upload_extension(filename):
+    """Return a file's extension, keeping compound extensions such as .csv.gz"""
+    filename = filename.lower()
+    for ext in COMPRESSED_CSV_EXTENSIONS:
+        if filename.endswith(ext):
+            return ext
+    return os.path.splitext(filename)[1]
+
 def validate_file(filename):
     """Validate file extension and return file type"""
     if not filename:
         return None, "No file selected"
     
-    ext = os.path.splitext(filename)[1].lower()
+    ext = upload_extension(filename)
     if ext not in app.config['UPLOAD_EXTENSIONS']:
         return None, f"Invalid file type. Allowed: {', '.join(app.config['UPLOAD_EXTENSIONS'])}"
     
     return ext, None
 
+@lru_cache(maxsize=app.config['PRODUCT_CLASSIFY_CACHE_SIZE'])
 def classify_product(product_description):
     """Classify product based on description"""
     if not product_description:
@@ -179,14 +340,29 @@ def classify_product(product_description):
     
     product_lower = product_description.lower()
     
-    if any(keyword in product_lower for keyword in ['software', 'license', 'app']):
-        return 'software'
-    elif any(keyword in product_lower for keyword in ['saas', 'subscription', 'service', 'platform']):
-        return 'saas'
-    elif any(keyword in product_lower for keyword in ['consulting', 'development', 'custom', 'professional']):
-        return 'consulting'
-    else:
-        return 'physical_goods'
+    for product_type, keywords in PRODUCT_TYPE_KEYWORDS:
+        if any(keyword in product_lower for keyword in keywords):
+            return product_type
+    return 'physical_goods'
+
+def classify_products(product_descriptions):
+    """Classify a column of product descriptions, evaluating each distinct value once"""
+    codes, uniques = pd.factorize(product_descriptions)
+    
+    # Classify the distinct descriptions, then map the labels back onto every row
+    unique_labels = []
+    for description in uniques:
+        description_lower = str(description).lower()
+        for product_type, pattern in PRODUCT_TYPE_PATTERNS:
+            if pattern.search(description_lower):
+                unique_labels.append(PRODUCT_TYPES.index(product_type))
+                break
+        else:
+            unique_labels.append(PRODUCT_TYPES.index('physical_goods'))
+    
+    label_codes = np.append(np.asarray(unique_labels, dtype=np.int8), PRODUCT_TYPES.index('physical_goods'))
+    product_types = pd.Categorical.from_codes(label_codes[codes], categories=PRODUCT_TYPES)
+    return pd.Series(product_types, index=getattr(product_descriptions, 'index', None), name='product_type')
 
 def is_product_taxable(product_type, state_code):
     """Check if product is taxable in a given state"""
@@ -194,61 +370,892 @@ def is_product_taxable(product_type, state_code):
         return PRODUCT_TAX_RULES[product_type][state_code]['taxable']
     return True  # Default to taxable
 
+class LocalTaxRate(Mapping):
+    """Immutable local rate record; reads like the rate dict it replaces (record['city_rate'])"""
+    __slots__ = ('city_rate', 'county_rate', 'district_rate', 'total_local_rate')
+    
+    def __init__(self, city_rate, county_rate, district_rate):
+        object.__setattr__(self, 'city_rate', city_rate)
+        object.__setattr__(self, 'county_rate', county_rate)
+        object.__setattr__(self, 'district_rate', district_rate)
+        object.__setattr__(self, 'total_local_rate', city_rate + county_rate + district_rate)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("LocalTaxRate records are immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("LocalTaxRate records are immutable")
+    
+    def __reduce__(self):
+        return (LocalTaxRate, (self.city_rate, self.county_rate, self.district_rate))
+    
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def __len__(self):
+        return len(self.__slots__)
+    
+    def __repr__(self):
+        return f"LocalTaxRate(city_rate={self.city_rate}, county_rate={self.county_rate}, district_rate={self.district_rate})"
+
+NO_LOCAL_RATE = LocalTaxRate(0.0, 0.0, 0.0)
+
+def jurisdiction_key(state_code, city_name):
+    """Normalized lookup key for a jurisdiction: b'STATE|lower-case city'"""
+    return f"{str(state_code).strip().upper()}|{str(city_name).strip().lower()}".encode('utf-8')
+
+def build_jurisdiction_array(jurisdictions):
+    """Compile a state/city/rate frame into a structured array sorted by jurisdiction key"""
+    jurisdictions = jurisdictions.dropna(subset=['state', 'city'])
+    keys = [jurisdiction_key(state_code, city_name) for state_code, city_name in zip(jurisdictions['state'], jurisdictions['city'])]
+    cities = [str(city_name).strip().encode('utf-8') for city_name in jurisdictions['city']]
+    
+    rates = np.zeros(len(keys), dtype=[
+        ('key', f"S{max([len(key) for key in keys], default=1)}"),
+        ('state', 'S2'),
+        ('city', f"S{max([len(city) for city in cities], default=1)}"),
+        ('city_rate', 'f8'),
+        ('county_rate', 'f8'),
+        ('district_rate', 'f8'),
+        ('total_local_rate', 'f8')
+    ])
+    rates['key'] = keys
+    rates['state'] = jurisdictions['state'].astype(str).str.strip().str.upper().str.encode('utf-8')
+    rates['city'] = cities
+    for col in ['city_rate', 'county_rate', 'district_rate']:
+        rates[col] = jurisdictions[col].fillna(0.0).astype(float) if col in jurisdictions.columns else 0.0
+    rates['total_local_rate'] = rates['city_rate'] + rates['county_rate'] + rates['district_rate']
+    
+    # Later rows win for duplicate jurisdictions, then sort so lookups can binary search
+    _, last = np.unique(rates['key'][::-1], return_index=True)
+    return rates[len(rates) - 1 - last]
+
+def compile_jurisdiction_rates(csv_path, npy_path):
+    """Compile a jurisdiction rate CSV (state, city, city_rate, county_rate, district_rate) to .npy"""
+    rates = build_jurisdiction_array(pd.read_csv(csv_path, dtype={'state': str, 'city': str}))
+    np.save(npy_path, rates)
+    return rates
+
+def load_jurisdiction_rates(path=None):
+    """Memory-map compiled jurisdiction rates, compile a CSV in memory, or fall back to LOCAL_TAX_RATES"""
+    if path and path.endswith('.csv'):
+        return build_jurisdiction_array(pd.read_csv(path, dtype={'state': str, 'city': str}))
+    if path:
+        return np.load(path, mmap_mode='r')
+    
+    return build_jurisdiction_array(pd.DataFrame([
+        {
+            'state': state_code,
+            'city': city_name,
+            'city_rate': rates['city'],
+            'county_rate': rates['county'],
+            'district_rate': rates['district']
+        }
+        for state_code, cities in LOCAL_TAX_RATES.items()
+        for city_name, rates in cities.items()
+    ], columns=['state', 'city', 'city_rate', 'county_rate', 'district_rate']))
+
+JURISDICTION_RATES = load_jurisdiction_rates(app.config['JURISDICTION_RATES_PATH'])
+JURISDICTION_KEYS = JURISDICTION_RATES['key']
+
+@lru_cache(maxsize=None)
+def local_rate_record(jurisdiction_id):
+    """Shared LocalTaxRate record for a jurisdiction row, or NO_LOCAL_RATE for -1"""
+    if jurisdiction_id < 0:
+        return NO_LOCAL_RATE
+    row = JURISDICTION_RATES[jurisdiction_id]
+    return LocalTaxRate(float(row['city_rate']), float(row['county_rate']), float(row['district_rate']))
+
+def resolve_jurisdictions(state_codes, city_names):
+    """Map state/city pairs to jurisdiction rows with one searchsorted call (-1 when unknown)"""
+    if not len(JURISDICTION_KEYS) or not len(state_codes):
+        return np.full(len(state_codes), -1, dtype=np.int64)
+    
+    # Normalize each distinct state and city once, then look up each distinct pair once
+    state_ids, states = pd.factorize(np.asarray(state_codes, dtype=object))
+    city_ids, cities = pd.factorize(np.asarray(city_names, dtype=object))
+    # Position 0 stands for a missing state or city, so codes shift up by one
+    states = np.insert(pd.Series(states, dtype=object).astype(str).str.strip().str.upper().to_numpy(dtype=object), 0, '')
+    cities = np.insert(pd.Series(cities, dtype=object).astype(str).str.strip().str.lower().to_numpy(dtype=object), 0, '')
+    pair_keys, pair_codes = np.unique((state_ids.astype(np.int64) + 1) * len(cities) + city_ids + 1, return_inverse=True)
+    pair_states, pair_cities = np.divmod(pair_keys, len(cities))
+    queries = pd.Series(states[pair_states] + '|' + cities[pair_cities]).str.encode('utf-8')
+    
+    # Missing keys never match; keys longer than the widest stored key must not be truncated into one
+    fits = ((queries.str.len() <= JURISDICTION_KEYS.dtype.itemsize) & (pair_states > 0) & (pair_cities > 0)).to_numpy()
+    queries = np.asarray(queries.where(fits, b''), dtype=JURISDICTION_KEYS.dtype)
+    positions = np.minimum(np.searchsorted(JURISDICTION_KEYS, queries), len(JURISDICTION_KEYS) - 1)
+    pair_ids = np.where(fits & (JURISDICTION_KEYS[positions] == queries), positions, -1)
+    return pair_ids[pair_codes]
+
+def jurisdiction_local_rates(jurisdiction_ids):
+    """Gather local rate columns for jurisdiction rows, zero where the id is -1"""
+    found = jurisdiction_ids >= 0
+    rows = JURISDICTION_RATES[np.where(found, jurisdiction_ids, 0)] if len(JURISDICTION_RATES) else None
+    return {
+        col: np.where(found, rows[col], 0.0) if rows is not None else np.zeros(len(jurisdiction_ids))
+        for col in ['city_rate', 'county_rate', 'district_rate', 'total_local_rate']
+    }
+
+@lru_cache(maxsize=65536)
 def get_local_tax_rates(state_code, city_name):
-    """Get local tax rates for a specific city and state"""
-    if state_code in LOCAL_TAX_RATES and city_name in LOCAL_TAX_RATES[state_code]:
-        local_rates = LOCAL_TAX_RATES[state_code][city_name]
-        return {
-            'city_rate': local_rates['city'],
-            'county_rate': local_rates['county'],
-            'district_rate': local_rates['district'],
-            'total_local_rate': local_rates['city'] + local_rates['county'] + local_rates['district']
+    """Get local tax rates for a specific city and state (case-insensitive, shared read-only record)"""
+    key = jurisdiction_key(state_code, city_name)
+    if len(key) > JURISDICTION_KEYS.dtype.itemsize or not len(JURISDICTION_KEYS):
+        return NO_LOCAL_RATE
+    position = int(JURISDICTION_KEYS.searchsorted(key))
+    if position < len(JURISDICTION_KEYS) and JURISDICTION_KEYS[position] == key:
+        return local_rate_record(position)
+    return NO_LOCAL_RATE
+
+def parse_zip_code(value):
+    """Parse a ZIP or ZIP+4 into a 9-digit integer and whether it was a bare 5-digit ZIP (-1 if invalid)"""
+    if isinstance(value, (float, np.floating)):
+        if not np.isfinite(value):
+            return -1, False
+        value = int(value)
+    
+    # Numeric columns drop leading zeros, so short values are zero-padded by int()
+    digits = re.sub(r'\D', '', str(value))
+    if not digits or len(digits) > 9:
+        return -1, False
+    if len(digits) <= 5:
+        return int(digits) * 10000, True
+    return int(digits), False
+
+def build_zip_range_array(zip_ranges):
+    """Compile a zip_start/zip_end/state/city frame into non-overlapping ranges sorted by start"""
+    # A missing or empty zip_end makes the row a single ZIP
+    if 'zip_end' not in zip_ranges.columns:
+        zip_ranges = zip_ranges.assign(zip_end=zip_ranges['zip_start'])
+    zip_ranges = zip_ranges.assign(zip_end=zip_ranges['zip_end'].replace('', np.nan).fillna(zip_ranges['zip_start']))
+    
+    starts = [parse_zip_code(value)[0] for value in zip_ranges['zip_start']]
+    # A bare ZIP as the end of a range covers all of its ZIP+4 codes
+    ends = [zip9 + 9999 if bare else zip9 for zip9, bare in map(parse_zip_code, zip_ranges['zip_end'])]
+    cities = [str(city_name).strip().encode('utf-8') for city_name in zip_ranges['city']]
+    
+    ranges = np.zeros(len(starts), dtype=[
+        ('start', 'i8'),
+        ('end', 'i8'),
+        ('state', 'S2'),
+        ('city', f"S{max([len(city) for city in cities], default=1)}")
+    ])
+    ranges['start'] = starts
+    ranges['end'] = ends
+    ranges['state'] = zip_ranges['state'].astype(str).str.strip().str.upper().str.encode('utf-8')
+    ranges['city'] = cities
+    
+    valid = (ranges['start'] >= 0) & (ranges['end'] >= ranges['start'])
+    if not valid.all():
+        invalid_rows = np.flatnonzero(~valid)
+        logging.warning(f"Skipping {len(invalid_rows)} ZIP ranges with an invalid or reversed start/end (rows {invalid_rows[:10].tolist()})")
+    ranges = ranges[valid]
+    ranges = ranges[np.argsort(ranges['start'], kind='stable')]
+    if np.any(ranges['start'][1:] <= ranges['end'][:-1]):
+        raise ValueError("ZIP ranges overlap; split them so each ZIP+4 belongs to one jurisdiction")
+    return ranges
+
+def compile_zip_ranges(csv_path, npy_path):
+    """Compile a ZIP range CSV (zip_start, zip_end, state, city) to .npy"""
+    ranges = build_zip_range_array(pd.read_csv(csv_path, dtype=str))
+    np.save(npy_path, ranges)
+    return ranges
+
+def load_zip_ranges(path=None):
+    """Memory-map compiled ZIP ranges, compile a CSV in memory, or return no ranges"""
+    if path and path.endswith('.csv'):
+        return build_zip_range_array(pd.read_csv(path, dtype=str))
+    if path:
+        return np.load(path, mmap_mode='r')
+    return build_zip_range_array(pd.DataFrame(columns=['zip_start', 'zip_end', 'state', 'city']))
+
+ZIP_RANGES = load_zip_ranges(app.config['ZIP_RANGES_PATH'])
+ZIP_RANGE_STATES = np.char.decode(ZIP_RANGES['state']).astype(object)
+ZIP_RANGE_CITIES = np.char.decode(ZIP_RANGES['city']).astype(object)
+
+def resolve_zip_ranges(zip_codes):
+    """Map a column of ZIP or ZIP+4 codes to ZIP range rows with one searchsorted call (-1 when unknown)"""
+    if isinstance(zip_codes, (list, tuple)):
+        zip_codes = np.asarray(zip_codes, dtype=object)
+    codes, uniques = pd.factorize(zip_codes)
+    if not len(ZIP_RANGES):
+        return np.full(len(codes), -1, dtype=np.int64)
+    
+    parsed = [parse_zip_code(value) for value in uniques]
+    queries = np.array([zip9 for zip9, _ in parsed], dtype=np.int64)
+    bare = np.array([is_bare for _, is_bare in parsed], dtype=bool)
+    
+    starts, ends = ZIP_RANGES['start'], ZIP_RANGES['end']
+    candidates = np.searchsorted(starts, queries, side='right') - 1
+    hit = (queries >= 0) & (candidates >= 0) & (queries <= ends[np.maximum(candidates, 0)])
+    
+    # A bare ZIP that is split into ZIP+4 ranges resolves to the first range inside it
+    following = np.minimum(candidates + 1, len(starts) - 1)
+    split = bare & ~hit & (candidates + 1 < len(starts)) & (starts[following] // 10000 == queries // 10000)
+    
+    range_ids = np.where(hit, candidates, np.where(split, following, -1))
+    return np.append(range_ids, -1)[codes]
+
+def zip_jurisdictions(zip_codes, state_codes, city_names=None):
+    """State and city of the ZIP range each row resolves to, keeping the row's own state and city
+    (or '') where it does not resolve"""
+    range_ids = resolve_zip_ranges(zip_codes)
+    resolved = range_ids >= 0
+    state_codes = np.asarray(state_codes, dtype=object)
+    city_names = np.asarray(city_names, dtype=object) if city_names is not None else np.full(len(range_ids), '', dtype=object)
+    if not resolved.any():
+        return state_codes, city_names
+    
+    # The ZIP names the taxing jurisdiction, so it overrides a state column that disagrees with it
+    zip_states = ZIP_RANGE_STATES[np.maximum(range_ids, 0)]
+    row_states = pd.Series(state_codes, dtype=object)
+    conflicts = resolved & row_states.notna().to_numpy() & (row_states.astype(str).str.strip().str.upper().to_numpy(dtype=object) != zip_states)
+    if conflicts.any():
+        logging.warning("%d rows have a state that disagrees with their ZIP; using the ZIP's state", int(conflicts.sum()))
+    
+    return (
+        np.where(resolved, zip_states, state_codes),
+        np.where(resolved, ZIP_RANGE_CITIES[np.maximum(range_ids, 0)], city_names)
+    )
+
+def build_rate_tables():
+    """Compile US_STATES and PRODUCT_TAX_RULES into a state/product lookup frame"""
+    return pd.DataFrame([
+        {
+            'state_code': state_code,
+            'product_type': product_type,
+            'state_rate': state_info['rate'],
+            'taxable': is_product_taxable(product_type, state_code)
         }
+        for state_code, state_info in US_STATES.items()
+        for product_type in PRODUCT_TYPES
+    ])
+
+STATE_PRODUCT_RATES = build_rate_tables()
+
+# Changes whenever the rate data changes, so cached results are never served against stale rates
+RATE_TABLE_VERSION = hashlib.sha256(
+    json.dumps([US_STATES, PRODUCT_TAX_RULES], sort_keys=True).encode()
+    + np.ascontiguousarray(JURISDICTION_RATES).tobytes()
+    + np.ascontiguousarray(ZIP_RANGES).tobytes()
+).hexdigest()[:12]
+
+def build_quote_tables():
+    """Freeze state/product rates into a read-only mapping for single-order quotes"""
+    return MappingProxyType({
+        (state_code, product_type): (state_info['rate'], is_product_taxable(product_type, state_code))
+        for state_code, state_info in US_STATES.items()
+        for product_type in PRODUCT_TYPES
+    })
+
+QUOTE_STATE_RATES = build_quote_tables()
+
+def quote_transaction(state_code, city_name, product_description, amount):
+    """Quote the tax on one order with the same rules apply_tax_rates uses for uploads"""
+    if not math.isfinite(amount):
+        raise ValueError("amount must be a finite number")
+    state_code = str(state_code).strip().upper()
+    # JSON may carry numbers or lists; classify their text as quote_transactions does
+    product_type = classify_product(str(product_description) if product_description is not None else None)
+    rates = QUOTE_STATE_RATES.get((state_code, product_type))
+    if rates is None:
+        raise ValueError(f"Unknown state: {state_code}")
+    
+    state_rate, taxable = rates
+    city_name = str(city_name).strip().title() if city_name else ''
+    local_rate = get_local_tax_rates(state_code, city_name).total_local_rate
+    state_tax = amount * state_rate if taxable else 0.0
+    local_tax = amount * local_rate if taxable else 0.0
+    
     return {
-        'city_rate': 0.0,
-        'county_rate': 0.0,
-        'district_rate': 0.0,
-        'total_local_rate': 0.0
+        'state': state_code,
+        'city': city_name,
+        'product_type': product_type,
+        'taxable': taxable,
+        'amount': amount,
+        'state_rate': state_rate,
+        'local_rate': local_rate,
+        'state_tax': state_tax,
+        'local_tax': local_tax,
+        'tax_owed': state_tax + local_tax,
+        'success': True
     }
 
-def analyze_sales_data_csv(file_stream):
+def quote_transactions(states, cities, products, amounts):
+    """Quote many orders in one vectorized pass, returning parallel lists in input order"""
+    amounts = np.asarray(amounts, dtype=float)
+    if not np.isfinite(amounts).all():
+        raise ValueError("amount must contain only finite numbers")
+    if cities is None:
+        cities = [''] * len(amounts)
+    if products is None:
+        products = [None] * len(amounts)
+    if not len(states) == len(cities) == len(products) == len(amounts):
+        raise ValueError("state, city, product and amount must have the same length")
+    
+    sales = pd.DataFrame({
+        'state_code': pd.Series(states, dtype=object).astype(str).str.strip().str.upper(),
+        'city_name': pd.Series(cities, dtype=object).fillna('').astype(str).str.strip().str.title(),
+        'product_type': classify_products(pd.Series(products, dtype=object)).astype(str),
+        'sales': amounts
+    })
+    sales = apply_tax_rates(sales)
+    
+    return {
+        'product_type': sales['product_type'].tolist(),
+        'known_state': sales['state_code'].isin(US_STATES).tolist(),
+        'taxable': sales['taxable'].tolist(),
+        'state_tax': sales['state_tax'].tolist(),
+        'local_tax': sales['local_tax'].tolist(),
+        'tax_owed': sales['tax_owed'].tolist(),
+        'count': len(sales),
+        'success': True
+    }
+
+def apply_tax_rates(sales):
+    """Join state, local and taxability rates onto sales rows and compute the taxes owed"""
+    jurisdiction_ids = resolve_jurisdictions(sales['state_code'], sales['city_name'])
+    sales = sales.merge(STATE_PRODUCT_RATES, on=['state_code', 'product_type'], how='left')
+    for col, rates in jurisdiction_local_rates(jurisdiction_ids).items():
+        sales[col] = rates
+    
+    rate_cols = ['state_rate', 'city_rate', 'county_rate', 'district_rate', 'total_local_rate']
+    sales[rate_cols] = sales[rate_cols].fillna(0.0)
+    sales['taxable'] = sales['taxable'].fillna(True).astype(bool)
+    
+    # Local taxes only apply where a city is known
+    has_city = sales['city_name'] != ''
+    sales['taxable_sales'] = sales['sales'].where(sales['taxable'], 0.0)
+    sales['state_tax'] = (sales['sales'] * sales['state_rate']).where(sales['taxable'], 0.0)
+    sales['local_tax'] = (sales['sales'] * sales['total_local_rate']).where(sales['taxable'] & has_city, 0.0)
+    sales['tax_owed'] = sales['state_tax'] + sales['local_tax']
+    return sales
+
+def detect_sales_columns(columns):
+    """Identify amount, state, city and product columns by keyword matching"""
+    return {
+        'amount_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['amount', 'total', 'price', 'sales', 'revenue'])],
+        'state_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['state', 'region', 'location'])],
+        'date_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['date', 'time', 'created'])],
+        'address_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['address', 'street', 'city', 'zip', 'postal'])],
+        'city_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['city', 'municipality'])],
+        'county_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['county', 'parish'])],
+        'zip_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['zip', 'postal'])],
+        'product_cols': [col for col in columns if any(keyword in col.lower() for keyword in ['product', 'item', 'description', 'type', 'category'])]
+    }
+
+def open_decompressed(file_stream, compression):
+    """Wrap a gzip or zstd compressed stream in a streaming decompressor"""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=file_stream, mode='rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is required for .csv.zst uploads")
+        # Small reads keep the compressed offset close to what the decompressed output consumed
+        return zstandard.ZstdDecompressor().stream_reader(file_stream, read_size=65536, closefd=False)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+def read_sales_csv_schema(file_stream, compression=None):
+    """Detect sales columns from the CSV header alone and build projected, typed read options"""
+    header = pd.read_csv(file_stream, nrows=0, compression=compression).columns
+    file_stream.seek(0)
+    columns = detect_sales_columns(header)
+    
+    # Load only the columns the analysis uses: every amount column plus the first state, city, ZIP and product column
+    key_cols = columns['state_cols'][:1] + columns['city_cols'][:1] + columns['product_cols'][:1]
+    if len(ZIP_RANGES):
+        key_cols += columns['zip_cols'][:1]
+    needed_cols = set(columns['amount_cols'] + key_cols)
+    dtype = {col: 'category' for col in key_cols}
+    dtype.update({col: 'float64' for col in columns['amount_cols']})
+    
+    # With no sales columns, still load the first column so rows are counted
+    usecols = [col for col in header if col in needed_cols] or list(header[:1])
+    
+    return columns, {
+        'usecols': usecols,
+        'dtype': dtype,
+        'compression': compression
+    }
+
+def read_sales_csv_preview(file_stream, compression=None):
+    """Read the first rows of a CSV with every column for the results preview"""
+    preview = pd.read_csv(file_stream, nrows=10, compression=compression).to_dict('records')
+    file_stream.seek(0)
+    return preview
+
+def resolve_csv_engine(engine=None):
+    """Return the configured CSV engine, falling back to pandas when pyarrow is missing"""
+    engine = engine or app.config['CSV_ENGINE']
+    if engine == 'pyarrow' and pa is None:
+        logging.warning("CSV_ENGINE is 'pyarrow' but pyarrow is not installed, using the default engine")
+        return 'c'
+    return engine
+
+def read_sales_csv(file_stream, read_options, engine):
+    """Load the projected sales columns of a CSV in one pass"""
+    return pd.read_csv(file_stream, engine=engine, **read_options)
+
+def iter_sales_csv_chunks(file_stream, read_options, chunksize, engine):
+    """Yield the projected sales columns of a CSV as bounded frames"""
+    if engine != 'pyarrow':
+        yield from pd.read_csv(file_stream, chunksize=chunksize, engine=engine, **read_options)
+        return
+    
+    # Arrow parses each block on all cores; key columns arrive dictionary-encoded so they convert to categoricals
+    column_types = {col: pa.dictionary(pa.int32(), pa.string()) for col, dtype in read_options['dtype'].items() if dtype == 'category'}
+    column_types.update({col: pa.float64() for col, dtype in read_options['dtype'].items() if dtype == 'float64'})
+    if read_options['compression']:
+        file_stream = open_decompressed(file_stream, read_options['compression'])
+    reader = pa_csv.open_csv(
+        file_stream,
+        read_options=pa_csv.ReadOptions(block_size=app.config['CSV_ARROW_BLOCK_SIZE']),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=read_options['usecols'],
+            column_types=column_types,
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+def group_sum(keys, values):
+    """Sum values by several keys through one factorized int64 group key and np.bincount"""
+    level_codes = []
+    levels = []
+    for key in keys:
+        # Missing keys keep their own group, coded after every real value as groupby sorts them
+        codes, uniques = pd.factorize(key, sort=True)
+        codes = codes.astype(np.int64)
+        codes[codes < 0] = len(uniques)
+        level_codes.append(codes)
+        levels.append(pd.Index(uniques))
+    sizes = [len(level) + 1 for level in levels]
+    
+    key_space = 1
+    for size in sizes:
+        key_space *= size
+    if key_space >= 2 ** 62:
+        return pd.Series(values).groupby(list(keys), observed=True, dropna=False).sum()
+    
+    group_key = np.zeros(len(values), dtype=np.int64)
+    for codes, size in zip(level_codes, sizes):
+        group_key = group_key * size + codes
+    
+    # NaN amounts count as zero, as in groupby().sum()
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    if key_space <= max(len(values), 1 << 20):
+        counts = np.bincount(group_key, minlength=key_space)
+        observed = np.flatnonzero(counts)
+        sums = np.bincount(group_key, weights=values, minlength=key_space)[observed]
+    else:
+        # Sparse key space: compact the observed keys before accumulating
+        observed, inverse = np.unique(group_key, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(observed))
+    
+    # Unpack the combined key back into per-level codes (-1 marks a missing key)
+    codes = []
+    for size in reversed(sizes):
+        level_code = observed % size
+        level_code[level_code == size - 1] = -1
+        codes.append(level_code)
+        observed = observed // size
+    index = pd.MultiIndex(levels=levels, codes=codes[::-1], names=[getattr(key, 'name', None) for key in keys], verify_integrity=False)
+    return pd.Series(sums, index=index, dtype=np.float64)
+
+def aggregate_sales(df, columns):
+    """Group sales rows once by state, city and product type, or None without state/amount columns"""
+    # Blank jurisdictions are kept as null groups so totals can later be rolled up without losing them
+    if not columns['amount_cols'] or not columns['state_cols']:
+        return None
+    
+    amount_col = columns['amount_cols'][0]
+    state_col = columns['state_cols'][0]
+    city_col = columns['city_cols'][0] if columns['city_cols'] else None
+    product_col = columns['product_cols'][0] if columns['product_cols'] else None
+    
+    zip_col = columns['zip_cols'][0] if columns.get('zip_cols') and len(ZIP_RANGES) else None
+    
+    if zip_col:
+        # A resolved ZIP names the taxing jurisdiction's state and city; other rows keep their own columns
+        state_codes, city_names = zip_jurisdictions(df[zip_col], df[state_col], df[city_col] if city_col else None)
+        group_keys = [pd.Series(state_codes, index=df.index, name='state'), pd.Series(city_names, index=df.index, name='city')]
+    else:
+        group_keys = [df[state_col].rename('state')]
+        if city_col:
+            group_keys.append(df[city_col].rename('city'))
+    
+    if product_col:
+        product_types = classify_products(df[product_col])
+    else:
+        product_types = pd.Series(pd.Categorical(['physical_goods'] * len(df), categories=PRODUCT_TYPES), index=df.index)
+    group_keys.append(product_types.rename('product_type'))
+    
+    return group_sum(group_keys, df[amount_col].to_numpy(dtype=np.float64, na_value=np.nan)).rename('amount')
+
+def merge_sales_totals(totals, partial):
+    """Fold a partial aggregate into the running sales totals"""
+    if totals is None:
+        return partial
+    combined = pd.concat([totals, partial])
+    keys = [combined.index.get_level_values(level) for level in range(combined.index.nlevels)]
+    return group_sum(keys, combined.to_numpy()).rename(combined.name)
+
+def stream_sales_totals(file_stream, chunksize, engine='c', compression=None):
+    """Read a sales CSV in bounded chunks and fold each chunk into running totals"""
+    columns, read_options = read_sales_csv_schema(file_stream, compression)
+    preview = read_sales_csv_preview(file_stream, compression)
+    totals = None
+    row_count = 0
+    total_revenue = 0
+    
+    for chunk in iter_sales_csv_chunks(file_stream, read_options, chunksize, engine):
+        row_count += len(chunk)
+        total_revenue += sum([chunk[col].sum() for col in columns['amount_cols']])
+        
+        partial = aggregate_sales(chunk, columns)
+        if partial is not None:
+            totals = merge_sales_totals(totals, partial)
+    
+    return {
+        'columns': columns,
+        'totals': totals,
+        'row_count': row_count,
+        'total_revenue': total_revenue,
+        'preview': preview
+    }
+
+def analyze_sales_totals(totals):
+    """Build the nexus and tax obligation reports from one aggregated sales series"""
+    if totals is None:
+        return {}, {}
+    
+    totals = totals.reset_index()
+    totals = totals.dropna(subset=[col for col in ['state', 'city'] if col in totals.columns])
+    
+    # Report jurisdictions in sorted order however the source encoded its categoricals
+    for col in ['state', 'city']:
+        if col in totals.columns and isinstance(totals[col].dtype, pd.CategoricalDtype):
+            totals[col] = totals[col].astype(object)
+    
+    city_cols = ['city'] if 'city' in totals.columns else None
+    nexus_analysis = analyze_nexus_threshold(totals, ['amount'], ['state'], city_cols)
+    tax_obligations = calculate_tax_obligations_by_product(totals, ['amount'], ['state'], city_cols, ['product_type'])
+    return nexus_analysis, tax_obligations
+
+def build_sales_results(totals, row_count, total_revenue, preview, **summary):
+    """Assemble the sales_data results dict from aggregated totals"""
+    nexus_analysis, tax_obligations = analyze_sales_totals(totals)
+    compliance_status = check_compliance_status(nexus_analysis)
+    filing_requirements = generate_filing_requirements(nexus_analysis)
+    
+    return {
+        'type': 'sales_data',
+        'summary': {
+            'total_transactions': row_count,
+            'total_revenue': total_revenue,
+            'states_with_sales': len(nexus_analysis),
+            'nexus_states': len([state for state, data in nexus_analysis.items() if data['has_nexus']]),
+            'filing_required': len(filing_requirements),
+            **summary
+        },
+        'nexus_analysis': nexus_analysis,
+        'tax_obligations': tax_obligations,
+        'compliance_status': compliance_status,
+        'filing_requirements': filing_requirements,
+        'preview': preview,
+        'success': True
+    }
+
+def analyze_sales_data_csv_streaming(file_stream, chunksize, engine='c', compression=None):
+    """Analyze a sales CSV chunk by chunk so memory scales with jurisdictions, not rows"""
+    streamed = stream_sales_totals(file_stream, chunksize, engine, compression)
+    return build_sales_results(
+        streamed['totals'],
+        streamed['row_count'],
+        streamed['total_revenue'],
+        streamed['preview'],
+        chunk_size=chunksize,
+        csv_engine=engine
+    )
+
+def stream_path(file_stream):
+    """Return the file path behind a stream, or None for in-memory streams"""
+    path = getattr(file_stream, 'name', None)
+    if not isinstance(path, str) or not os.path.isfile(path):
+        return None
+    
+    # Archive members carry their member name, which may coincide with an unrelated file on disk
+    try:
+        return path if os.path.samestat(os.fstat(file_stream.fileno()), os.stat(path)) else None
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def upload_source(file_stream):
+    """Return an upload's file path when it is on disk, otherwise its bytes"""
+    path = stream_path(file_stream)
+    if path:
+        file_stream.flush()
+        return path
+    file_stream.seek(0)
+    return file_stream.read()
+
+@contextmanager
+def spooled_upload_path(file_stream, suffix):
+    """Yield a filesystem path for an upload, spooling in-memory streams into UPLOAD_FOLDER"""
+    path = stream_path(file_stream)
+    if path:
+        yield path
+        return
+    
+    file_stream.seek(0)
+    with tempfile.NamedTemporaryFile(dir=app.config['UPLOAD_FOLDER'], suffix=suffix, delete=False) as spooled:
+        shutil.copyfileobj(file_stream, spooled, 1024 * 1024)
+    try:
+        yield spooled.name
+    finally:
+        os.remove(spooled.name)
+
+def quote_identifier(name):
+    """Quote a column name for use in DuckDB SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def product_type_sql(product_expr):
+    """SQL CASE expression mirroring classify_product"""
+    cases = []
+    for product_type, keywords in PRODUCT_TYPE_KEYWORDS:
+        matches = ' OR '.join(f"contains(lower({product_expr}), '{keyword}')" for keyword in keywords)
+        cases.append(f"WHEN {matches} THEN '{product_type}'")
+    return f"CASE {' '.join(cases)} ELSE 'physical_goods' END"
+
+def aggregate_sales_duckdb(path, columns, compression=None):
+    """Aggregate a sales CSV by state, city and product type with DuckDB in one scan"""
+    con = duckdb.connect()
+    try:
+        con.execute(f"SET memory_limit = '{app.config['DUCKDB_MEMORY_LIMIT']}'")
+        con.execute("SET temp_directory = ?", [os.path.abspath(app.config['UPLOAD_FOLDER'])])
+        
+        zip_col = columns['zip_cols'][0] if columns.get('zip_cols') and len(ZIP_RANGES) else None
+        key_cols = columns['state_cols'][:1] + columns['city_cols'][:1] + columns['product_cols'][:1] + ([zip_col] if zip_col else [])
+        column_types = {col: 'VARCHAR' for col in key_cols}
+        column_types.update({col: 'DOUBLE' for col in columns['amount_cols']})
+        # DuckDB rejects an empty types struct, so files without sales columns leave types to detection
+        types_sql = f", types = {{{', '.join(f'{quote_identifier(col)}: {sql_type!r}' for col, sql_type in column_types.items())}}}" if column_types else ''
+        source = f"read_csv(?, header = true, compression = '{compression or 'none'}'{types_sql})"
+        
+        revenue_cols = [f"COALESCE(SUM({quote_identifier(col)}), 0)" for col in columns['amount_cols']]
+        totals_sql = f"SELECT COUNT(*), {' + '.join(revenue_cols) or '0'} FROM {source}"
+        if not columns['amount_cols'] or not columns['state_cols']:
+            row_count, total_revenue = con.execute(totals_sql, [path]).fetchone()
+            return None, row_count, total_revenue
+        
+        # The grand-total grouping set yields row count and revenue from the same scan
+        group_keys = [f"{quote_identifier(columns['state_cols'][0])} AS state"]
+        if columns['city_cols']:
+            group_keys.append(f"{quote_identifier(columns['city_cols'][0])} AS city")
+        if zip_col:
+            group_keys.append(f"{quote_identifier(zip_col)} AS zip")
+        product_expr = product_type_sql(quote_identifier(columns['product_cols'][0])) if columns['product_cols'] else "'physical_goods'"
+        group_keys.append(f"{product_expr} AS product_type")
+        key_names = [key.rsplit(' AS ', 1)[1] for key in group_keys]
+        
+        aggregate = con.execute(f"""
+            SELECT {', '.join(group_keys)},
+                   SUM({quote_identifier(columns['amount_cols'][0])}) AS amount,
+                   COUNT(*) AS row_count,
+                   {' + '.join(revenue_cols)} AS total_revenue,
+                   GROUPING({', '.join(key_names)}) AS grouping_id
+            FROM {source}
+            GROUP BY GROUPING SETS (({', '.join(key_names)}), ())
+        """, [path]).df()
+    finally:
+        con.close()
+    
+    grand_total = aggregate[aggregate['grouping_id'] > 0].iloc[0]
+    groups = aggregate[aggregate['grouping_id'] == 0]
+    if 'zip' in key_names:
+        # Resolve the grouped ZIPs to jurisdictions, then fold them back into state/city/product
+        state_codes, city_names = zip_jurisdictions(groups['zip'], groups['state'], groups['city'] if 'city' in key_names else None)
+        groups = groups.assign(state=state_codes, city=city_names)
+        key_names = ['state', 'city', 'product_type']
+        groups = groups.dropna(subset=['state', 'product_type'])
+        totals = group_sum([groups[key] for key in key_names], groups['amount'].fillna(0.0).to_numpy()).rename('amount')
+    else:
+        groups = groups.dropna(subset=key_names)
+        totals = groups.set_index(key_names)['amount'].fillna(0.0)
+    return totals, int(grand_total['row_count']), grand_total['total_revenue']
+
+def analyze_sales_data_duckdb(file_stream, compression=None):
+    """Analyze a sales CSV out of core with DuckDB, producing the same report shapes as pandas"""
+    columns, _ = read_sales_csv_schema(file_stream, compression)
+    
+    with spooled_upload_path(file_stream, '.csv') as path:
+        totals, row_count, total_revenue = aggregate_sales_duckdb(path, columns, compression)
+        file_stream.seek(0)
+        preview = read_sales_csv_preview(file_stream, compression)
+    
+    return build_sales_results(totals, row_count, total_revenue, preview, backend='duckdb')
+
+def available_memory():
+    """Return available system memory in bytes, or None if it cannot be determined"""
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def estimate_sales_csv(file_stream, compression=None, size_hint=None):
+    """Estimate rows and in-memory size of a sales CSV from its size and a sampled row width"""
+    sample_bytes = app.config['ENGINE_SAMPLE_BYTES']
+    if size_hint is not None:
+        file_size = size_hint
+        sample = file_stream.read(sample_bytes)
+    else:
+        file_stream.seek(0, os.SEEK_END)
+        file_size = file_stream.tell()
+        file_stream.seek(0)
+        if compression:
+            # Scale the stored size by the compression ratio observed on the sample
+            sample = open_decompressed(file_stream, compression).read(sample_bytes)
+            consumed = file_stream.tell()
+            if len(sample) == sample_bytes and consumed:
+                file_size = int(file_size * len(sample) / consumed)
+            else:
+                file_size = len(sample)
+        else:
+            sample = file_stream.read(sample_bytes)
+    file_stream.seek(0)
+    
+    # Skip the header and the possibly truncated last line when measuring rows
+    sample_rows = max(sample.count(b'\n') - 1, 1)
+    header_end = sample.find(b'\n') + 1
+    last_newline = sample.rfind(b'\n') + 1
+    row_bytes = max((last_newline - header_end) / sample_rows, 1) if last_newline > header_end else max(len(sample), 1)
+    
+    # Projected columns load as float64 or categorical codes; parsing peaks at several times that
+    _, read_options = read_sales_csv_schema(file_stream, compression)
+    estimated_rows = int((file_size - header_end) / row_bytes)
+    memory_row_bytes = (len(read_options['usecols']) + 1) * 8 * PARSE_MEMORY_OVERHEAD
+    
+    return {
+        'file_size': file_size,
+        'compression': compression,
+        'sampled_row_bytes': round(row_bytes, 1),
+        'estimated_rows': estimated_rows,
+        'estimated_memory': estimated_rows * memory_row_bytes,
+        'memory_row_bytes': memory_row_bytes,
+        'available_memory': available_memory()
+    }
+
+def select_sales_engine(file_stream, compression=None, size_hint=None):
+    """Choose the cheapest CSV processing path for an upload's size and the memory available"""
+    estimate = estimate_sales_csv(file_stream, compression, size_hint)
+    available = estimate['available_memory']
+    memory_budget = available * app.config['ENGINE_MEMORY_FRACTION'] if available else None
+    fits_in_memory = memory_budget is None or estimate['estimated_memory'] <= memory_budget
+    
+    if estimate['file_size'] <= app.config['ENGINE_SMALL_FILE_BYTES'] and fits_in_memory:
+        engine = 'pandas'
+    elif fits_in_memory:
+        engine = 'arrow' if pa is not None else 'chunked'
+    elif duckdb is not None and stream_path(file_stream):
+        # DuckDB reads from disk; streams such as zip members would have to be expanded first
+        engine = 'duckdb'
+    else:
+        engine = 'chunked'
+    
+    # Use the configured chunk size, or size chunks to a small slice of the memory budget
+    chunk_size = 0
+    if engine == 'chunked':
+        chunk_size = app.config['CSV_CHUNK_SIZE'] or max(100000, int((memory_budget or 2 * 1024 ** 3) * 0.1 / estimate['memory_row_bytes']))
+    
+    # The plan only picks the path; an explicitly configured pyarrow parser is kept on every path
+    csv_engine = 'pyarrow' if engine == 'arrow' or app.config['CSV_ENGINE'] == 'pyarrow' or (engine == 'chunked' and pa is not None) else 'c'
+    
+    logging.info(f"Selected '{engine}' sales engine: {estimate}")
+    return {
+        'engine': engine,
+        'backend': 'duckdb' if engine == 'duckdb' else 'pandas',
+        'chunk_size': chunk_size,
+        'csv_engine': csv_engine,
+        'estimate': estimate
+    }
+
+def analyze_sales_data_csv_whole(file_stream, engine='c', compression=None):
+    """Analyze a sales CSV loaded into memory in one pass"""
+    # Identify common column patterns from the header, then load only those columns
+    columns, read_options = read_sales_csv_schema(file_stream, compression)
+    preview = read_sales_csv_preview(file_stream, compression)
+    df = read_sales_csv(file_stream, read_options, engine)
+    amount_cols = columns['amount_cols']
+    
+    # Calculate sales tax analysis with product-based taxability from a single grouping pass
+    totals = aggregate_sales(df, columns)
+    nexus_analysis, tax_obligations = analyze_sales_totals(totals)
+    compliance_status = check_compliance_status(nexus_analysis)
+    
+    # Generate filing requirements
+    filing_requirements = generate_filing_requirements(nexus_analysis)
+    
+    return {
+        'type': 'sales_data',
+        'summary': {
+            'total_transactions': len(df),
+            'total_revenue': sum([df[col].sum() for col in amount_cols if col in df.columns]),
+            'states_with_sales': len(nexus_analysis),
+            'nexus_states': len([state for state, data in nexus_analysis.items() if data['has_nexus']]),
+            'filing_required': len(filing_requirements)
+        },
+        'nexus_analysis': nexus_analysis,
+        'tax_obligations': tax_obligations,
+        'compliance_status': compliance_status,
+        'filing_requirements': filing_requirements,
+        'preview': preview,
+        'success': True
+    }
+
+def analyze_sales_data_csv(file_stream, chunksize=None, engine=None, backend=None, compression=None, size_hint=None):
     """Analyze sales data from CSV files for tax compliance"""
     try:
-        df = pd.read_csv(file_stream)
+        backend = backend or app.config['SALES_BACKEND']
+        plan = None
+        if backend == 'auto':
+            plan = select_sales_engine(file_stream, compression, size_hint)
+            backend = plan['backend']
+            chunksize = plan['chunk_size'] if chunksize is None else chunksize
+            engine = engine or plan['csv_engine']
         
-        # Identify common column patterns
-        amount_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['amount', 'total', 'price', 'sales', 'revenue'])]
-        state_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['state', 'region', 'location'])]
-        date_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['date', 'time', 'created'])]
-        address_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['address', 'street', 'city', 'zip', 'postal'])]
-        city_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['city', 'municipality'])]
-        county_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['county', 'parish'])]
-        product_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['product', 'item', 'description', 'type', 'category'])]
-        
-        # Calculate sales tax analysis with product-based taxability
-        nexus_analysis = analyze_nexus_threshold(df, amount_cols, state_cols, city_cols)
-        tax_obligations = calculate_tax_obligations_by_product(df, amount_cols, state_cols, city_cols, product_cols)
-        compliance_status = check_compliance_status(nexus_analysis)
+        if chunksize is None:
+            chunksize = app.config['CSV_CHUNK_SIZE']
+        engine = resolve_csv_engine(engine)
+        if backend == 'duckdb' and duckdb is None:
+            logging.warning("SALES_BACKEND is 'duckdb' but duckdb is not installed, using pandas")
+            backend = 'pandas'
         
-        # Generate filing requirements
-        filing_requirements = generate_filing_requirements(nexus_analysis)
+        if backend == 'duckdb':
+            results = analyze_sales_data_duckdb(file_stream, compression)
+        elif chunksize:
+            results = analyze_sales_data_csv_streaming(file_stream, chunksize, engine, compression)
+        else:
+            results = analyze_sales_data_csv_whole(file_stream, engine, compression)
         
-        return {
-            'type': 'sales_data',
-            'summary': {
-                'total_transactions': len(df),
-                'total_revenue': sum([df[col].sum() for col in amount_cols if col in df.columns]),
-                'states_with_sales': len(nexus_analysis),
-                'nexus_states': len([state for state, data in nexus_analysis.items() if data['has_nexus']]),
-                'filing_required': len(filing_requirements)
-            },
-            'nexus_analysis': nexus_analysis,
-            'tax_obligations': tax_obligations,
-            'compliance_status': compliance_status,
-            'filing_requirements': filing_requirements,
-            'preview': df.head(10).to_dict('records') if len(df) > 0 else [],
-            'success': True
-        }
+        if plan:
+            results['summary']['engine'] = plan['engine']
+            results['summary']['engine_estimate'] = plan['estimate']
+        return results
         
     except Exception as e:
         logging.error(f"Sales data analysis error: {str(e)}")
@@ -271,15 +1278,20 @@ def analyze_nexus_threshold(df, amount_cols, state_cols, city_cols=None):
     
     # Group sales by state (and city if available)
     if city_col and city_col in df.columns:
-        grouped_sales = df.groupby([state_col, city_col])[amount_col].sum() if state_col in df.columns and amount_col in df.columns else {}
+        grouped_sales = df.groupby([state_col, city_col], observed=True)[amount_col].sum() if state_col in df.columns and amount_col in df.columns else {}
     else:
-        grouped_sales = df.groupby(state_col)[amount_col].sum() if state_col in df.columns and amount_col in df.columns else {}
+        grouped_sales = df.groupby(state_col, observed=True)[amount_col].sum() if state_col in df.columns and amount_col in df.columns else {}
     
     # Aggregate by state for nexus analysis
     state_totals = {}
     local_tax_details = {}
     
-    for key, sales_amount in grouped_sales.items():
+    # Resolve every state/city group against the jurisdiction rates in one pass
+    jurisdiction_ids = []
+    if isinstance(grouped_sales, pd.Series) and grouped_sales.index.nlevels == 2:
+        jurisdiction_ids = resolve_jurisdictions(grouped_sales.index.get_level_values(0), grouped_sales.index.get_level_values(1))
+    
+    for position, (key, sales_amount) in enumerate(grouped_sales.items()):
         if isinstance(key, tuple):  # State and city
             state_code, city_name = key
             state_code = str(state_code).upper()
@@ -291,8 +1303,12 @@ def analyze_nexus_threshold(df, amount_cols, state_cols, city_cols=None):
             
             state_totals[state_code] += sales_amount
             
+            # Rows without a known city count toward the state but have no local breakdown
+            if city_name == '':
+                continue
+            
             # Get local tax rates for this city
-            local_rates = get_local_tax_rates(state_code, city_name)
+            local_rates = local_rate_record(int(jurisdiction_ids[position]))
             local_tax_details[state_code].append({
                 'city': city_name,
                 'sales': sales_amount,
@@ -350,7 +1366,7 @@ def calculate_tax_obligations_by_product(df, amount_cols, state_cols, city_cols=
     
     # Add product classification column
     if product_col and product_col in df.columns:
-        df['product_type'] = df[product_col].apply(classify_product)
+        df['product_type'] = classify_products(df[product_col])
     else:
         df['product_type'] = 'physical_goods'
     
@@ -359,98 +1375,68 @@ def calculate_tax_obligations_by_product(df, amount_cols, state_cols, city_cols=
     if city_col and city_col in df.columns:
         group_cols.insert(1, city_col)
     
-    grouped_sales = df.groupby(group_cols)[amount_col].sum() if all(col in df.columns for col in group_cols) else {}
+    if not all(col in df.columns for col in group_cols):
+        return tax_obligations
+    
+    grouped_sales = df.groupby(group_cols, observed=True)[amount_col].sum().reset_index()
+    sales = pd.DataFrame({
+        'state_code': grouped_sales[state_col].astype(str).str.upper(),
+        'city_name': grouped_sales[city_col].astype(str).str.title() if len(group_cols) == 3 else '',
+        'product_type': grouped_sales['product_type'].astype(str),
+        'sales': grouped_sales[amount_col]
+    })
+    
+    # Only states with known rates are reported
+    sales = apply_tax_rates(sales[sales['state_code'].isin(US_STATES)])
+    if sales.empty:
+        return tax_obligations
     
     # Aggregate by state for tax calculations
-    state_details = {}
+    state_totals = sales.groupby('state_code', sort=False)[['sales', 'taxable_sales', 'state_tax', 'local_tax']].sum()
+    product_totals = sales.groupby(['state_code', 'product_type'], sort=False).agg(
+        total_sales=('sales', 'sum'),
+        taxable_sales=('taxable_sales', 'sum'),
+        tax_owed=('tax_owed', 'sum'),
+        is_taxable=('taxable', 'first')
+    )
     
-    for key, sales_amount in grouped_sales.items():
-        if len(group_cols) == 3:  # State, city, product
-            state_code, city_name, product_type = key
-            city_name = str(city_name).title()
-        else:  # State, product
-            state_code, product_type = key
-            city_name = None
-        
-        state_code = str(state_code).upper()
-        
-        if state_code not in state_details:
-            state_details[state_code] = {
-                'total_sales': 0,
-                'taxable_sales': 0,
-                'state_tax_owed': 0,
-                'local_tax_owed': 0,
-                'product_breakdown': {},
-                'city_breakdown': []
-            }
-        
-        # Check if product is taxable in this state
-        is_taxable = is_product_taxable(product_type, state_code)
-        
-        state_details[state_code]['total_sales'] += sales_amount
-        
-        if is_taxable:
-            state_details[state_code]['taxable_sales'] += sales_amount
-            
-            # Calculate taxes
-            if state_code in US_STATES:
-                state_tax_rate = US_STATES[state_code]['rate']
-                state_tax = sales_amount * state_tax_rate
-                state_details[state_code]['state_tax_owed'] += state_tax
-                
-                # Calculate local taxes if city available
-                if city_name:
-                    local_rates = get_local_tax_rates(state_code, city_name)
-                    local_tax = sales_amount * local_rates['total_local_rate']
-                    state_details[state_code]['local_tax_owed'] += local_tax
-                    
-                    # Track city breakdown
-                    state_details[state_code]['city_breakdown'].append({
-                        'city': city_name,
-                        'product_type': product_type,
-                        'sales': sales_amount,
-                        'taxable': is_taxable,
-                        'state_tax': state_tax,
-                        'local_tax': local_tax,
-                        'local_rates': local_rates
-                    })
-        
-        # Track product breakdown
-        if product_type not in state_details[state_code]['product_breakdown']:
-            state_details[state_code]['product_breakdown'][product_type] = {
-                'total_sales': 0,
-                'taxable_sales': 0,
-                'tax_owed': 0,
-                'is_taxable': is_taxable
+    product_breakdowns = {state_code: {} for state_code in state_totals.index}
+    for (state_code, product_type), row in zip(product_totals.index, product_totals.to_dict('records')):
+        product_breakdowns[state_code][product_type] = row
+    
+    # Track city breakdown for taxable sales with a known city
+    city_breakdowns = {state_code: [] for state_code in state_totals.index}
+    city_sales = sales[sales['taxable'] & (sales['city_name'] != '')]
+    for row in city_sales.to_dict('records'):
+        city_breakdowns[row['state_code']].append({
+            'city': row['city_name'],
+            'product_type': row['product_type'],
+            'sales': row['sales'],
+            'taxable': row['taxable'],
+            'state_tax': row['state_tax'],
+            'local_tax': row['local_tax'],
+            'local_rates': {
+                'city_rate': row['city_rate'],
+                'county_rate': row['county_rate'],
+                'district_rate': row['district_rate'],
+                'total_local_rate': row['total_local_rate']
             }
-        
-        state_details[state_code]['product_breakdown'][product_type]['total_sales'] += sales_amount
-        if is_taxable:
-            state_details[state_code]['product_breakdown'][product_type]['taxable_sales'] += sales_amount
-            if state_code in US_STATES:
-                product_tax = sales_amount * US_STATES[state_code]['rate']
-                if city_name:
-                    local_rates = get_local_tax_rates(state_code, city_name)
-                    product_tax += sales_amount * local_rates['total_local_rate']
-                state_details[state_code]['product_breakdown'][product_type]['tax_owed'] += product_tax
+        })
     
     # Format final results
-    for state_code, details in state_details.items():
-        if state_code in US_STATES:
-            total_tax_owed = details['state_tax_owed'] + details['local_tax_owed']
-            
-            tax_obligations[state_code] = {
-                'state_name': US_STATES[state_code]['name'],
-                'total_sales': details['total_sales'],
-                'taxable_sales': details['taxable_sales'],
-                'non_taxable_sales': details['total_sales'] - details['taxable_sales'],
-                'state_tax_rate': US_STATES[state_code]['rate'],
-                'state_tax_owed': details['state_tax_owed'],
-                'local_tax_owed': details['local_tax_owed'],
-                'total_tax_owed': total_tax_owed,
-                'product_breakdown': details['product_breakdown'],
-                'city_breakdown': details['city_breakdown']
-            }
+    for state_code, totals in zip(state_totals.index, state_totals.to_dict('records')):
+        tax_obligations[state_code] = {
+            'state_name': US_STATES[state_code]['name'],
+            'total_sales': totals['sales'],
+            'taxable_sales': totals['taxable_sales'],
+            'non_taxable_sales': totals['sales'] - totals['taxable_sales'],
+            'state_tax_rate': US_STATES[state_code]['rate'],
+            'state_tax_owed': totals['state_tax'],
+            'local_tax_owed': totals['local_tax'],
+            'total_tax_owed': totals['state_tax'] + totals['local_tax'],
+            'product_breakdown': product_breakdowns[state_code],
+            'city_breakdown': city_breakdowns[state_code]
+        }
     
     return tax_obligations
 
@@ -503,24 +1489,82 @@ def generate_filing_requirements(nexus_analysis):
     
     return filing_requirements
 
+def open_excel(source):
+    """Open a workbook from a file path or from bytes"""
+    return pd.ExcelFile(source if isinstance(source, str) else io.BytesIO(source))
+
+def read_excel_sheets(source, sheet_names):
+    """Parse a group of workbook sheets, returning (sheet name, frame) pairs for non-empty sheets"""
+    excel_file = open_excel(source)
+    frames = []
+    for sheet_name in sheet_names:
+        try:
+            df = pd.read_excel(excel_file, sheet_name=sheet_name)
+            if not df.empty:
+                frames.append((sheet_name, df))
+        except Exception as sheet_error:
+            logging.warning(f"Error reading sheet '{sheet_name}': {str(sheet_error)}")
+            continue
+    return frames
+
+# Forking a threaded server can copy locks held by other threads, so workers start from a clean forkserver
+PROCESS_POOL_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+PROCESS_POOLS = {}
+PROCESS_POOLS_LOCK = threading.Lock()
+
+def process_pool_map(name, max_workers, fn, *iterables):
+    """Map fn over a long-lived process pool shared by every request, started on first use"""
+    with PROCESS_POOLS_LOCK:
+        pool = PROCESS_POOLS.get(name)
+        if pool is None:
+            pool = PROCESS_POOLS[name] = ProcessPoolExecutor(max_workers=max_workers, mp_context=PROCESS_POOL_CONTEXT)
+    
+    try:
+        return list(pool.map(fn, *iterables))
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); drop the pool so the next request starts a fresh one
+        with PROCESS_POOLS_LOCK:
+            if PROCESS_POOLS.get(name) is pool:
+                del PROCESS_POOLS[name]
+        raise
+
+def read_excel_workbook(source, sheet_names, workers=None):
+    """Parse workbook sheets across a process pool and combine them with a single concat"""
+    if workers is None:
+        workers = app.config['EXCEL_PARSE_WORKERS']
+    # Handing sheets to worker processes costs more than parsing a small workbook
+    source_size = os.path.getsize(source) if isinstance(source, str) else len(source)
+    if source_size < app.config['EXCEL_PARALLEL_MIN_BYTES']:
+        workers = 1
+    workers = max(1, min(workers, len(sheet_names)))
+    
+    # Give each worker a contiguous run of sheets so sheet order is preserved
+    group_size = -(-len(sheet_names) // workers) if sheet_names else 1
+    sheet_groups = [sheet_names[i:i + group_size] for i in range(0, len(sheet_names), group_size)]
+    
+    if len(sheet_groups) > 1:
+        grouped_frames = process_pool_map('excel', max(app.config['EXCEL_PARSE_WORKERS'], 1), read_excel_sheets, [source] * len(sheet_groups), sheet_groups)
+    else:
+        grouped_frames = [read_excel_sheets(source, group) for group in sheet_groups]
+    
+    frames = [frame for group in grouped_frames for frame in group]
+    if not frames:
+        return pd.DataFrame()
+    
+    combined_df = pd.concat([df for _, df in frames], ignore_index=True)
+    sheet_codes = np.repeat([sheet_names.index(sheet_name) for sheet_name, _ in frames], [len(df) for _, df in frames])
+    combined_df['source_sheet'] = pd.Categorical.from_codes(sheet_codes, categories=sheet_names)
+    return combined_df
+
 def analyze_sales_data_excel(file_stream):
     """Analyze sales data from Excel files for tax compliance"""
     try:
-        file_stream.seek(0)
-        excel_file = pd.ExcelFile(file_stream)
-        sheet_names = excel_file.sheet_names
+        # Workers reopen spooled uploads by path rather than receiving a copy of the bytes
+        source = upload_source(file_stream)
+        sheet_names = open_excel(source).sheet_names
         
         # Combine all sheets for analysis
-        combined_df = pd.DataFrame()
-        for sheet_name in sheet_names:
-            try:
-                df = pd.read_excel(excel_file, sheet_name=sheet_name)
-                if not df.empty:
-                    df['source_sheet'] = sheet_name
-                    combined_df = pd.concat([combined_df, df], ignore_index=True)
-            except Exception as sheet_error:
-                logging.warning(f"Error reading sheet '{sheet_name}': {str(sheet_error)}")
-                continue
+        combined_df = read_excel_workbook(source, sheet_names)
         
         if combined_df.empty:
             return {
@@ -530,14 +1574,12 @@ def analyze_sales_data_excel(file_stream):
             }
         
         # Identify common column patterns
-        amount_cols = [col for col in combined_df.columns if any(keyword in col.lower() for keyword in ['amount', 'total', 'price', 'sales', 'revenue'])]
-        state_cols = [col for col in combined_df.columns if any(keyword in col.lower() for keyword in ['state', 'region', 'location'])]
-        city_cols = [col for col in combined_df.columns if any(keyword in col.lower() for keyword in ['city', 'municipality'])]
-        
-        # Calculate sales tax analysis with product-based taxability
-        product_cols = [col for col in combined_df.columns if any(keyword in col.lower() for keyword in ['product', 'item', 'description', 'type', 'category'])]
-        nexus_analysis = analyze_nexus_threshold(combined_df, amount_cols, state_cols, city_cols if city_cols else None)
-        tax_obligations = calculate_tax_obligations_by_product(combined_df, amount_cols, state_cols, city_cols if city_cols else None, product_cols if product_cols else None)
+        columns = detect_sales_columns(combined_df.columns)
+        amount_cols = columns['amount_cols']
+        
+        # Calculate sales tax analysis with product-based taxability from a single grouping pass
+        totals = aggregate_sales(combined_df, columns)
+        nexus_analysis, tax_obligations = analyze_sales_totals(totals)
         compliance_status = check_compliance_status(nexus_analysis)
         filing_requirements = generate_filing_requirements(nexus_analysis)
         
@@ -567,50 +1609,115 @@ def analyze_sales_data_excel(file_stream):
             'success': False
         }
 
+def scan_dollar_amounts(text, threshold=None):
+    """Flag dollar amounts over the threshold in a single pass over the text"""
+    if threshold is None:
+        threshold = app.config['DOLLAR_FLAG_THRESHOLD']
+    
+    flagged_lines = []
+    newline_index = None
+    
+    for match in DOLLAR_AMOUNT_PATTERN.finditer(text):
+        try:
+            # Remove $ and commas, convert to float
+            amount = float(match.group()[1:].replace(',', ''))
+        except ValueError:
+            continue
+        
+        if amount > threshold:
+            # Map the match offset back to its line, indexing newlines only once something is flagged
+            if newline_index is None:
+                newline_index = [newline.start() for newline in NEWLINE_PATTERN.finditer(text)]
+            line_index = bisect.bisect_right(newline_index, match.start())
+            line_start = newline_index[line_index - 1] + 1 if line_index > 0 else 0
+            line_end = newline_index[line_index] if line_index < len(newline_index) else len(text)
+            flagged_lines.append({
+                'line_number': line_index + 1,
+                'content': text[line_start:line_end].strip(),
+                'amount': amount
+            })
+    
+    return flagged_lines
+
+def open_pdf(source):
+    """Open a PDF from a file path (read lazily by MuPDF) or from bytes"""
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+def extract_pdf_pages(source, start, stop, threshold):
+    """Extract text and flagged amounts for a range of pages from a privately opened document"""
+    doc = open_pdf(source)
+    pages = []
+    
+    try:
+        for page_num in range(start, stop):
+            page = doc.load_page(page_num)
+            page_text = f"\n--- Page {page_num + 1} ---\n{page.get_text()}"
+            
+            # Line numbers are relative to the page; the caller shifts them once offsets are known
+            pages.append((page_text, scan_dollar_amounts(page_text, threshold)))
+    finally:
+        doc.close()
+    
+    return pages
+
+def extract_pdf_text(source, page_count, workers=None):
+    """Extract page texts, splitting page ranges across a process pool for large documents"""
+    if workers is None:
+        workers = app.config['PDF_PARSE_WORKERS']
+    if page_count < app.config['PDF_PARALLEL_MIN_PAGES']:
+        workers = 1
+    workers = max(1, min(workers, page_count))
+    
+    threshold = app.config['DOLLAR_FLAG_THRESHOLD']
+    pages_per_worker = -(-page_count // workers) if page_count else 1
+    page_ranges = [(start, min(start + pages_per_worker, page_count)) for start in range(0, page_count, pages_per_worker)]
+    
+    if len(page_ranges) > 1:
+        page_groups = process_pool_map(
+            'pdf',
+            max(app.config['PDF_PARSE_WORKERS'], 1),
+            extract_pdf_pages,
+            [source] * len(page_ranges),
+            [start for start, _ in page_ranges],
+            [stop for _, stop in page_ranges],
+            [threshold] * len(page_ranges)
+        )
+    else:
+        page_groups = [extract_pdf_pages(source, start, stop, threshold) for start, stop in page_ranges]
+    
+    return [page for group in page_groups for page in group]
+
 def extract_from_pdf(file_stream):
     """Extract and analyze text from PDF files"""
     try:
-        file_stream.seek(0)  # Reset stream position
-        doc = fitz.open(stream=file_stream.read(), filetype="pdf")
-        
-        all_text = ""
+        # Spooled uploads are opened by path so the document is never read into memory whole
+        source = upload_source(file_stream)
+        doc = open_pdf(source)
         page_count = len(doc)
-        
-        for page_num in range(page_count):
-            page = doc.load_page(page_num)
-            text = page.get_text()
-            all_text += f"\n--- Page {page_num + 1} ---\n{text}"
-        
         doc.close()
         
-        # Find lines with dollar amounts
-        lines = all_text.split('\n')
+        pages = extract_pdf_text(source, page_count)
+        
+        # Every page starts with a newline, so its lines follow on from the previous page's
+        page_texts = []
         flagged_lines = []
+        line_offset = 0
+        for page_text, page_flags in pages:
+            for flag in page_flags:
+                flag['line_number'] += line_offset
+            flagged_lines.extend(page_flags)
+            page_texts.append(page_text)
+            line_offset += page_text.count('\n')
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line and '$' in line:
-                # Try to extract dollar amounts
-                import re
-                dollar_amounts = re.findall(r'\$[\d,]+\.?\d*', line)
-                for amount_str in dollar_amounts:
-                    try:
-                        # Remove $ and commas, convert to float
-                        amount = float(amount_str.replace('$', '').replace(',', ''))
-                        if amount > 10000:
-                            flagged_lines.append({
-                                'line_number': i + 1,
-                                'content': line,
-                                'amount': amount
-                            })
-                    except ValueError:
-                        continue
+        all_text = ''.join(page_texts)
         
         return {
             'type': 'pdf',
             'summary': {
                 'pages': page_count,
-                'total_lines': len(lines),
+                'total_lines': line_offset + 1,
                 'flagged_transactions': len(flagged_lines)
             },
             'flagged_data': flagged_lines,
@@ -626,6 +1733,63 @@ def extract_from_pdf(file_stream):
             'success': False
         }
 
+class OCREnginePool:
+    """Pool of long-lived tesseract engines that recognize PIL images in memory"""
+    
+    def __init__(self, size, language):
+        self.size = max(1, size)
+        self.language = language
+        self._engines = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def engine(self):
+        """Borrow an engine, creating one lazily until the pool is full"""
+        try:
+            api = self._engines.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    api = tesserocr.PyTessBaseAPI(lang=self.language, psm=tesserocr.PSM.SINGLE_BLOCK)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                api = self._engines.get()
+        
+        try:
+            yield api
+        finally:
+            api.Clear()
+            self._engines.put(api)
+    
+    def image_to_string(self, image):
+        """Run OCR on a PIL image with a warm engine"""
+        with self.engine() as api:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+OCR_ENGINE_POOL = OCREnginePool(app.config['OCR_ENGINES'], app.config['OCR_LANGUAGE']) if tesserocr else None
+
+def ocr_image(image):
+    """Extract text from an image, preferring the warm engine pool over spawning tesseract"""
+    backend = app.config['OCR_BACKEND']
+    if OCR_ENGINE_POOL is not None and backend in ('auto', 'tesserocr'):
+        try:
+            return OCR_ENGINE_POOL.image_to_string(image)
+        except Exception as e:
+            logging.warning(f"Persistent OCR engine failed, falling back to pytesseract: {str(e)}")
+    elif backend == 'tesserocr':
+        logging.warning("OCR_BACKEND is 'tesserocr' but tesserocr is not installed, using pytesseract")
+    
+    return pytesseract.image_to_string(image, config='--psm 6', lang=app.config['OCR_LANGUAGE'])
+
 def extract_from_image(file_stream):
     """Extract and analyze text from images using OCR"""
     try:
@@ -637,30 +1801,11 @@ def extract_from_image(file_stream):
             image = image.convert('RGB')
         
         # Perform OCR
-        text = pytesseract.image_to_string(image, config='--psm 6')
+        text = ocr_image(image)
         
         # Find lines with dollar amounts
         lines = text.split('\n')
-        flagged_lines = []
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line and '$' in line:
-                # Try to extract dollar amounts
-                import re
-                dollar_amounts = re.findall(r'\$[\d,]+\.?\d*', line)
-                for amount_str in dollar_amounts:
-                    try:
-                        # Remove $ and commas, convert to float
-                        amount = float(amount_str.replace('$', '').replace(',', ''))
-                        if amount > 10000:
-                            flagged_lines.append({
-                                'line_number': i + 1,
-                                'content': line,
-                                'amount': amount
-                            })
-                    except ValueError:
-                        continue
+        flagged_lines = scan_dollar_amounts(text)
         
         return {
             'type': 'image',
@@ -682,6 +1827,357 @@ def extract_from_image(file_stream):
             'success': False
         }
 
+class ResultCache:
+    """Size-bounded LRU cache of analysis results with TTL eviction"""
+    
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached result for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, result):
+        """Store a result, evicting the least recently used entries past the size limit"""
+        if self.max_entries <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def stats(self):
+        """Return hit and miss counters for the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'rate_table_version': RATE_TABLE_VERSION
+            }
+
+RESULT_CACHE = ResultCache(app.config['RESULT_CACHE_SIZE'], app.config['RESULT_CACHE_TTL'])
+
+def hash_upload(file_stream, block_size=1024 * 1024):
+    """Hash upload bytes in blocks and rewind the stream"""
+    digest = hashlib.sha256()
+    file_stream.seek(0)
+    for block in iter(lambda: file_stream.read(block_size), b''):
+        digest.update(block)
+    file_stream.seek(0)
+    return digest.hexdigest()
+
+def find_zip_sales_member(archive):
+    """Return the first CSV or Excel member of a zip archive, or None"""
+    for info in archive.infolist():
+        if not info.is_dir() and not info.filename.startswith('__MACOSX/') and upload_extension(info.filename) in ['.csv', '.xlsx', '.xls']:
+            return info
+    return None
+
+def analyze_zip_upload(file_stream):
+    """Analyze the first sales CSV or workbook in a zip archive, decompressing it as a stream"""
+    try:
+        with zipfile.ZipFile(file_stream) as archive:
+            info = find_zip_sales_member(archive)
+            if info is None:
+                return {
+                    'type': 'sales_data',
+                    'error': "No CSV or Excel file found in zip archive",
+                    'success': False
+                }
+            
+            with archive.open(info) as member:
+                if upload_extension(info.filename) == '.csv':
+                    return analyze_sales_data_csv(member, size_hint=info.file_size)
+                return analyze_sales_data_excel(member)
+                
+    except zipfile.BadZipFile as e:
+        logging.error(f"Zip processing error: {str(e)}")
+        return {
+            'type': 'sales_data',
+            'error': f"Error reading zip archive: {str(e)}",
+            'success': False
+        }
+
+def analyze_upload(ext, file_stream):
+    """Dispatch an upload to its analyzer, reusing cached results for identical files"""
+    cache_key = (hash_upload(file_stream), ext, RATE_TABLE_VERSION)
+    results = RESULT_CACHE.get(cache_key)
+    if results is not None:
+        logging.debug(f"Result cache hit for {ext} upload {cache_key[0][:12]}")
+        return results
+    
+    if ext == '.csv':
+        results = analyze_sales_data_csv(file_stream)
+    elif ext in COMPRESSED_CSV_EXTENSIONS:
+        results = analyze_sales_data_csv(file_stream, compression=COMPRESSED_CSV_EXTENSIONS[ext])
+    elif ext == '.zip':
+        results = analyze_zip_upload(file_stream)
+    elif ext in ['.xlsx', '.xls']:
+        results = analyze_sales_data_excel(file_stream)
+    elif ext == '.pdf':
+        results = extract_from_pdf(file_stream)
+    elif ext in ['.png', '.jpg', '.jpeg']:
+        results = extract_from_image(file_stream)
+    
+    if results and results['success']:
+        RESULT_CACHE.set(cache_key, results)
+    return results
+
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['JOB_WORKERS'], thread_name_prefix='upload-job')
+JOBS = {}
+JOBS_LOCK = threading.Lock()
+
+def prune_jobs():
+    """Forget finished jobs older than the retention window"""
+    cutoff = time.time() - app.config['JOB_RETENTION']
+    with JOBS_LOCK:
+        expired = [job_id for job_id, job in JOBS.items() if job['finished_at'] and job['finished_at'] < cutoff]
+        for job_id in expired:
+            del JOBS[job_id]
+
+def claim_upload(file, path):
+    """Move an upload to path, keeping it past the end of the request"""
+    spooled_files = getattr(request, 'spooled_files', [])
+    if file.stream in spooled_files:
+        file.stream.close()
+        os.replace(file.stream.name, path)
+        spooled_files.remove(file.stream)
+    else:
+        file.save(path)
+
+def submit_job(file, ext):
+    """Save an upload to UPLOAD_FOLDER and queue it for background processing"""
+    prune_jobs()
+    with JOBS_LOCK:
+        active_jobs = len([job for job in JOBS.values() if job['status'] in ('queued', 'running')])
+        if active_jobs >= app.config['JOB_QUEUE_LIMIT']:
+            return None, "Job queue is full. Please try again later."
+        
+        job_id = uuid.uuid4().hex
+        path = os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}{ext}")
+        JOBS[job_id] = {
+            'job_id': job_id,
+            'filename': secure_filename(file.filename),
+            'status': 'queued',
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None,
+            'results': None
+        }
+    
+    claim_upload(file, path)
+    JOB_EXECUTOR.submit(run_job, job_id, path, ext)
+    return job_id, None
+
+def run_job(job_id, path, ext):
+    """Process a queued upload and record its results"""
+    with JOBS_LOCK:
+        JOBS[job_id].update(status='running', started_at=time.time())
+    
+    try:
+        with open(path, 'rb') as file_stream:
+            results = analyze_upload(ext, file_stream)
+        status = 'completed' if results and results['success'] else 'failed'
+        error = results.get('error') if results else "Unsupported file type"
+    except Exception as e:
+        logging.error(f"Job {job_id} failed: {str(e)}")
+        results, status, error = None, 'failed', f"Error processing file: {str(e)}"
+    finally:
+        os.remove(path)
+    
+    with JOBS_LOCK:
+        JOBS[job_id].update(status=status, finished_at=time.time(), error=error, results=results)
+
+def job_status(job):
+    """Describe a job without its results payload"""
+    return {key: value for key, value in job.items() if key != 'results'}
+
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['BATCH_WORKERS'], thread_name_prefix='batch-file')
+
+def load_sales_totals(ext, file_stream):
+    """Aggregate one sales upload to jurisdiction totals without building its report"""
+    if ext == '.zip':
+        with zipfile.ZipFile(file_stream) as archive:
+            info = find_zip_sales_member(archive)
+            if info is None:
+                raise ValueError("No CSV or Excel file found in zip archive")
+            with archive.open(info) as member:
+                return load_sales_totals(upload_extension(info.filename), member)
+    
+    if ext in ['.xlsx', '.xls']:
+        source = upload_source(file_stream)
+        combined_df = read_excel_workbook(source, open_excel(source).sheet_names)
+        if combined_df.empty:
+            raise ValueError("No readable data found in Excel file")
+        columns = detect_sales_columns(combined_df.columns)
+        return {
+            'columns': columns,
+            'totals': aggregate_sales(combined_df, columns),
+            'row_count': len(combined_df),
+            'total_revenue': sum([combined_df[col].sum() for col in columns['amount_cols']]),
+            'preview': combined_df.head(10).to_dict('records')
+        }
+    
+    # Stream CSVs in bounded chunks so concurrent files don't each hold a whole frame
+    chunksize = app.config['CSV_CHUNK_SIZE'] or app.config['BATCH_CSV_CHUNK_SIZE']
+    return stream_sales_totals(file_stream, chunksize, resolve_csv_engine(), COMPRESSED_CSV_EXTENSIONS.get(ext))
+
+def combine_sales_totals(file_totals):
+    """Merge per-file sales totals, dropping the city level unless every file has it"""
+    file_totals = [totals for totals in file_totals if totals is not None]
+    if not file_totals:
+        return None
+    
+    if not all('city' in totals.index.names for totals in file_totals):
+        file_totals = [totals.groupby(level=['state', 'product_type'], observed=True, dropna=False).sum() for totals in file_totals]
+    
+    combined = pd.concat(file_totals)
+    return combined.groupby(level=list(range(combined.index.nlevels)), observed=True, dropna=False).sum()
+
+def process_batch_file(filename, ext, file_stream):
+    """Analyze one file of a batch, returning its entry and any sales totals to merge"""
+    try:
+        if ext in SALES_EXTENSIONS:
+            sales = load_sales_totals(ext, file_stream)
+            return {
+                'filename': filename,
+                'type': 'sales_data',
+                'summary': {
+                    'total_transactions': sales['row_count'],
+                    'total_revenue': sales['total_revenue'],
+                    'city_breakdown': sales['totals'] is not None and 'city' in sales['totals'].index.names
+                },
+                'success': True
+            }, sales
+        
+        results = analyze_upload(ext, file_stream)
+        return dict(results, filename=filename), None
+        
+    except Exception as e:
+        logging.error(f"Batch file {filename} failed: {str(e)}")
+        return {
+            'filename': filename,
+            'error': f"Error processing file: {str(e)}",
+            'success': False
+        }, None
+
+def build_batch_results(entries):
+    """Combine batch entries into per-file results and one merged sales view"""
+    sales = [file_sales for _, file_sales in entries if file_sales is not None]
+    sales_data = None
+    if sales:
+        sales_data = build_sales_results(
+            combine_sales_totals([file_sales['totals'] for file_sales in sales]),
+            sum([file_sales['row_count'] for file_sales in sales]),
+            sum([file_sales['total_revenue'] for file_sales in sales]),
+            sales[0]['preview'],
+            files_merged=len(sales)
+        )
+    
+    return {
+        'files': [entry for entry, _ in entries],
+        'sales_data': sales_data,
+        'success': any(entry['success'] for entry, _ in entries)
+    }
+
+def select_result_fields(results, fields=None, exclude=()):
+    """Trim a results dict to the requested top-level fields, dropping excluded keys per state too"""
+    always = {'type', 'success', 'error'}
+    trimmed = {key: value for key, value in results.items() if (not fields or key in fields or key in always) and key not in exclude}
+    
+    # Per-state reports carry their own city_breakdown, which dominates the payload for large exports
+    for report in ['nexus_analysis', 'tax_obligations']:
+        if exclude and isinstance(trimmed.get(report), dict):
+            trimmed[report] = {
+                state_code: {key: value for key, value in data.items() if key not in exclude}
+                for state_code, data in trimmed[report].items()
+            }
+    return trimmed
+
+def api_response(payload, status=200):
+    """Serialize a payload as JSON, gzip-compressing it when the client accepts gzip"""
+    body = app.json.dumps(payload).encode()
+    response = app.response_class(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    
+    if len(body) >= app.config['API_GZIP_MIN_BYTES'] and request.accept_encodings['gzip'] > 0:
+        response.set_data(gzip.compress(body, compresslevel=app.config['API_GZIP_LEVEL']))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+CHUNKED_UPLOAD_FOLDER = os.path.join(app.config['UPLOAD_FOLDER'], 'chunked')
+UPLOAD_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+def chunked_upload_dir(upload_id):
+    """Return the chunk directory for an upload id, or None if it is unknown or malformed"""
+    if not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+        return None
+    upload_dir = os.path.join(CHUNKED_UPLOAD_FOLDER, upload_id)
+    return upload_dir if os.path.isdir(upload_dir) else None
+
+def prune_chunked_uploads():
+    """Remove chunked uploads that have not been touched within the TTL"""
+    if not os.path.isdir(CHUNKED_UPLOAD_FOLDER):
+        return
+    cutoff = time.time() - app.config['CHUNKED_UPLOAD_TTL']
+    for upload_id in os.listdir(CHUNKED_UPLOAD_FOLDER):
+        upload_dir = os.path.join(CHUNKED_UPLOAD_FOLDER, upload_id)
+        if os.path.getmtime(upload_dir) < cutoff:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+def read_upload_manifest(upload_dir):
+    """Load the filename and extension recorded when a chunked upload started"""
+    with open(os.path.join(upload_dir, 'manifest.json')) as manifest:
+        return json.load(manifest)
+
+def received_chunks(upload_dir):
+    """Return {chunk index: size} for the chunks stored so far"""
+    chunks = {}
+    for name in os.listdir(upload_dir):
+        if name.endswith('.chunk'):
+            chunks[int(name[:-len('.chunk')])] = os.path.getsize(os.path.join(upload_dir, name))
+    return dict(sorted(chunks.items()))
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, read in bounded blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def assemble_chunks(upload_dir, chunk_count, path):
+    """Concatenate chunks 0..chunk_count-1 into path"""
+    with open(path, 'wb') as assembled:
+        for index in range(chunk_count):
+            with open(os.path.join(upload_dir, f"{index}.chunk"), 'rb') as chunk:
+                shutil.copyfileobj(chunk, assembled, 1024 * 1024)
+
 @app.route('/')
 def index():
     """Main page with upload form"""
@@ -706,15 +2202,7 @@ def upload_file():
         return redirect(url_for('index'))
     
     # Process file based on type
-    results = None
-    if ext == '.csv':
-        results = analyze_sales_data_csv(file.stream)
-    elif ext in ['.xlsx', '.xls']:
-        results = analyze_sales_data_excel(file.stream)
-    elif ext == '.pdf':
-        results = extract_from_pdf(file.stream)
-    elif ext in ['.png', '.jpg', '.jpeg']:
-        results = extract_from_image(file.stream)
+    results = analyze_upload(ext, file.stream)
     
     if results and results['success']:
         nexus_count = results["summary"].get("nexus_states", 0)
@@ -726,9 +2214,278 @@ def upload_file():
     
     return render_template('index.html', results=results, filename=secure_filename(file.filename))
 
+@app.route('/cache/stats')
+def cache_stats():
+    """Report result cache hit and miss counters"""
+    return jsonify(RESULT_CACHE.stats())
+
+@app.route('/api/analyze', methods=['POST'])
+def api_analyze():
+    """Analyze an upload and return the results as JSON instead of rendering the page"""
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return api_response({'error': 'No file selected', 'success': False}, 400)
+    
+    ext, error = validate_file(file.filename)
+    if error:
+        return api_response({'error': error, 'success': False}, 400)
+    
+    results = analyze_upload(ext, file.stream)
+    if not results or not results['success']:
+        return api_response(results or {'error': 'Unsupported file type', 'success': False}, 422)
+    
+    # ?fields=summary,nexus_analysis keeps only those sections; ?exclude=city_breakdown,preview drops keys
+    fields = {field for field in request.args.get('fields', '').split(',') if field}
+    exclude = {field for field in request.args.get('exclude', '').split(',') if field}
+    return api_response(select_result_fields(results, fields, exclude))
+
+@app.route('/api/quote', methods=['GET', 'POST'])
+def api_quote():
+    """Quote the sales tax on one order from state, city, product and amount"""
+    params = request.get_json(silent=True)
+    if params is None:
+        params = request.values
+    elif not isinstance(params, dict):
+        return api_response({'error': 'Expected a JSON object', 'success': False}, 400)
+    
+    try:
+        amount = float(params['amount'])
+        quote = quote_transaction(params['state'], params.get('city'), params.get('product'), amount)
+    except KeyError as e:
+        return api_response({'error': f"Missing parameter: {e.args[0]}", 'success': False}, 400)
+    except (TypeError, ValueError) as e:
+        return api_response({'error': str(e), 'success': False}, 400)
+    
+    return api_response(quote)
+
+@app.route('/api/quote/bulk', methods=['POST'])
+def api_quote_bulk():
+    """Quote many orders at once from parallel state, city, product and amount arrays"""
+    params = request.get_json(silent=True)
+    if not isinstance(params, dict):
+        return api_response({'error': 'Expected a JSON object of arrays', 'success': False}, 400)
+    
+    # A string state would pass the length check character by character, so every field must be an array
+    for field in ['state', 'city', 'product', 'amount']:
+        if params.get(field) is not None and not isinstance(params[field], list):
+            return api_response({'error': f"{field} must be an array", 'success': False}, 400)
+    
+    try:
+        quotes = quote_transactions(params['state'], params.get('city'), params.get('product'), params['amount'])
+    except KeyError as e:
+        return api_response({'error': f"Missing parameter: {e.args[0]}", 'success': False}, 400)
+    except (TypeError, ValueError) as e:
+        return api_response({'error': str(e), 'success': False}, 400)
+    
+    return api_response(quotes)
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue an upload for background processing and return its job id"""
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    ext, error = validate_file(file.filename)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    job_id, error = submit_job(file, ext)
+    if error:
+        return jsonify({'error': error}), 503
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': url_for('get_job', job_id=job_id),
+        'results_url': url_for('get_job_results', job_id=job_id)
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Return the status of a queued upload"""
+    with JOBS_LOCK:
+        job = JOBS.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        return jsonify(job_status(job))
+
+@app.route('/jobs/<job_id>/results')
+def get_job_results(job_id):
+    """Return the analysis results of a finished upload"""
+    with JOBS_LOCK:
+        job = JOBS.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        if job['status'] in ('queued', 'running'):
+            return jsonify(job_status(job)), 409
+        return jsonify(job['results'] or {'error': job['error'], 'success': False})
+
+@app.route('/batch', methods=['POST'])
+def batch_upload():
+    """Analyze many uploads concurrently, merging sales files into one nexus and obligations view"""
+    files = [file for file in request.files.getlist('files') if file.filename]
+    if not files:
+        return jsonify({'error': 'No files selected'}), 400
+    if len(files) > app.config['BATCH_MAX_FILES']:
+        return jsonify({'error': f"Too many files. Maximum is {app.config['BATCH_MAX_FILES']} per batch."}), 400
+    
+    entries = [None] * len(files)
+    futures = {}
+    for index, file in enumerate(files):
+        filename = secure_filename(file.filename)
+        ext, error = validate_file(file.filename)
+        if error:
+            entries[index] = ({'filename': filename, 'error': error, 'success': False}, None)
+        else:
+            futures[index] = BATCH_EXECUTOR.submit(process_batch_file, filename, ext, file.stream)
+    
+    for index, future in futures.items():
+        entries[index] = future.result()
+    
+    return jsonify(build_batch_results(entries))
+
+@app.route('/uploads', methods=['POST'])
+def start_chunked_upload():
+    """Start a resumable upload that is sent as numbered chunks"""
+    prune_chunked_uploads()
+    filename = (request.get_json(silent=True) or {}).get('filename', '')
+    ext, error = validate_file(filename)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    upload_id = uuid.uuid4().hex
+    upload_dir = os.path.join(CHUNKED_UPLOAD_FOLDER, upload_id)
+    os.makedirs(upload_dir)
+    with open(os.path.join(upload_dir, 'manifest.json'), 'w') as manifest:
+        json.dump({'filename': secure_filename(filename), 'ext': ext, 'started_at': time.time()}, manifest)
+    
+    return jsonify({
+        'upload_id': upload_id,
+        'status_url': url_for('get_chunked_upload', upload_id=upload_id),
+        'complete_url': url_for('complete_chunked_upload', upload_id=upload_id)
+    }), 201
+
+@app.route('/uploads/<upload_id>')
+def get_chunked_upload(upload_id):
+    """List the chunks received so far so clients can resume where they stopped"""
+    upload_dir = chunked_upload_dir(upload_id)
+    if upload_dir is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    
+    chunks = received_chunks(upload_dir)
+    return jsonify({
+        'upload_id': upload_id,
+        'filename': read_upload_manifest(upload_dir)['filename'],
+        'received_chunks': list(chunks),
+        'bytes_received': sum(chunks.values())
+    })
+
+@app.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def put_upload_chunk(upload_id, index):
+    """Store one numbered chunk, skipping chunks that were already received intact"""
+    upload_dir = chunked_upload_dir(upload_id)
+    if upload_dir is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    
+    if index >= app.config['CHUNKED_UPLOAD_MAX_CHUNKS']:
+        return jsonify({'index': index, 'error': f"Uploads are limited to {app.config['CHUNKED_UPLOAD_MAX_CHUNKS']} chunks"}), 413
+    
+    # The assembled file is held to the same MAX_CONTENT_LENGTH ceiling as a single upload
+    byte_budget = app.config['MAX_CONTENT_LENGTH'] - sum(size for chunk_index, size in received_chunks(upload_dir).items() if chunk_index != index)
+    if request.content_length is not None and request.content_length > byte_budget:
+        return jsonify({'index': index, 'error': 'Upload exceeds the maximum file size'}), 413
+    
+    # With an X-Chunk-SHA256 header retries are matched by content; without one only the byte length is compared
+    checksum = request.headers.get('X-Chunk-SHA256', '').strip().lower() or None
+    chunk_path = os.path.join(upload_dir, f"{index}.chunk")
+    if os.path.exists(chunk_path):
+        if checksum is not None and file_sha256(chunk_path) == checksum:
+            return jsonify({'index': index, 'status': 'skipped'})
+        if checksum is None and request.content_length is not None and os.path.getsize(chunk_path) == request.content_length:
+            return jsonify({'index': index, 'status': 'skipped'})
+    
+    # Write to a partial file first so an interrupted PUT never leaves a truncated chunk behind
+    partial_path = f"{chunk_path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    try:
+        with open(partial_path, 'wb') as chunk:
+            for block in iter(lambda: request.stream.read(1024 * 1024), b''):
+                digest.update(block)
+                chunk.write(block)
+                # Bodies without a Content-Length are cut off once they pass the budget
+                if chunk.tell() > byte_budget:
+                    return jsonify({'index': index, 'error': 'Upload exceeds the maximum file size'}), 413
+        if checksum is not None and digest.hexdigest() != checksum:
+            return jsonify({'index': index, 'error': 'Chunk does not match its X-Chunk-SHA256 checksum'}), 400
+        os.replace(partial_path, chunk_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    
+    os.utime(upload_dir)
+    return jsonify({'index': index, 'status': 'stored', 'size': os.path.getsize(chunk_path), 'sha256': digest.hexdigest()}), 201
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Assemble the chunks and run the same validation and analysis as /upload"""
+    upload_dir = chunked_upload_dir(upload_id)
+    if upload_dir is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    
+    manifest = read_upload_manifest(upload_dir)
+    chunks = received_chunks(upload_dir)
+    params = request.get_json(silent=True)
+    chunk_count = len(chunks)
+    if isinstance(params, dict) and 'total_chunks' in params:
+        chunk_count = params['total_chunks']
+        if isinstance(chunk_count, bool) or not isinstance(chunk_count, int) or chunk_count < 1:
+            return jsonify({'error': 'total_chunks must be a positive integer'}), 400
+        if chunk_count > app.config['CHUNKED_UPLOAD_MAX_CHUNKS']:
+            return jsonify({'error': f"Uploads are limited to {app.config['CHUNKED_UPLOAD_MAX_CHUNKS']} chunks"}), 413
+    missing = [index for index in range(chunk_count) if index not in chunks]
+    if missing or not chunk_count:
+        return jsonify({'error': 'Upload is incomplete', 'missing_chunks': missing}), 409
+    if sum(chunks[index] for index in range(chunk_count)) > app.config['MAX_CONTENT_LENGTH']:
+        return jsonify({'error': 'Upload exceeds the maximum file size'}), 413
+    
+    ext, error = validate_file(manifest['filename'])
+    if error:
+        return jsonify({'error': error}), 400
+    
+    path = os.path.join(app.config['UPLOAD_FOLDER'], f"{upload_id}{ext}")
+    try:
+        assemble_chunks(upload_dir, chunk_count, path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        with open(path, 'rb') as file_stream:
+            results = analyze_upload(ext, file_stream)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    
+    if not results or not results['success']:
+        return jsonify(results or {'error': 'Unsupported file type', 'success': False}), 422
+    return jsonify(results)
+
+@app.cli.command('compile-rates')
+@click.argument('csv_path')
+@click.argument('npy_path')
+def compile_rates_command(csv_path, npy_path):
+    """Compile a jurisdiction rate CSV into the .npy file JURISDICTION_RATES_PATH loads"""
+    rates = compile_jurisdiction_rates(csv_path, npy_path)
+    click.echo(f"Compiled {len(rates):,} jurisdictions to {npy_path}")
+
+@app.cli.command('compile-zips')
+@click.argument('csv_path')
+@click.argument('npy_path')
+def compile_zips_command(csv_path, npy_path):
+    """Compile a ZIP range CSV into the .npy file ZIP_RANGES_PATH loads"""
+    ranges = compile_zip_ranges(csv_path, npy_path)
+    click.echo(f"Compiled {len(ranges):,} ZIP ranges to {npy_path}")
+
 @app.errorhandler(413)
 def too_large(e):
-    flash('File is too large. Maximum size is 10MB.', 'error')
+    flash(f"File is too large. Maximum size is {app.config['MAX_CONTENT_LENGTH'] / 1024 ** 3:g}GB.", 'error')
     return redirect(url_for('index'))
 
 @app.errorhandler(500)